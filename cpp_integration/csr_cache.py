@@ -0,0 +1,107 @@
+"""Road networks as CSR arrays, cached in <graphml>.npz for RoadNetwork.from_csr.
+
+Shared by test.py and testAStar.py, which build the arrays (testAStar.py also reads
+and writes the cache), and osm_data/download_process_osm.py, which writes the cache
+next to each freshly downloaded graph. Installed as a top-level module with the project (see
+pyproject.toml), so the download script can import it from any directory.
+"""
+
+import numpy as np
+
+# Names of the CSR arrays, in RoadNetwork.from_csr argument order, in the .npz cache
+CSR_ARRAY_NAMES = ("indptr", "indices", "weights", "lats", "lons", "ids")
+# Name of the .npz entry recording which edge attribute the weights were taken from
+CSR_WEIGHT_KEY = "weight_attribute"
+
+
+def graph_to_csr(G_nx, weight_attribute):
+    """Converts an OSMnx graph to CSR arrays for RoadNetwork.from_csr.
+
+    Returns (indptr, indices, weights, lats, lons, ids): row i is node ids[i] at
+    (lats[i], lons[i]), and its edges are indices/weights[indptr[i]:indptr[i + 1]],
+    with indices pointing at rows. Parallel edges keep their lowest weight. Nodes
+    without coordinates, and edges touching them, are dropped, as the C++ A* cannot
+    expand such nodes anyway.
+    """
+    import osmnx as ox  # Imported lazily; test.py imports this module before osmnx
+
+    # Convert nodes and edges to GeoDataFrames once; all further work is column-wise
+    gdf_nodes, gdf_edges = ox.graph_to_gdfs(
+        G_nx, node_geometry=False, fill_edge_geometry=False
+    )
+
+    # Extract node coordinates as whole columns instead of walking node attribute dicts
+    ys = gdf_nodes["y"].to_numpy(dtype=np.float64)
+    xs = gdf_nodes["x"].to_numpy(dtype=np.float64)
+    has_coords = ~(np.isnan(ys) | np.isnan(xs))
+    missing_coords = int((~has_coords).sum())
+    node_index = gdf_nodes.index[has_coords]
+    ids = node_index.to_numpy(dtype=np.int64)
+    lats = np.ascontiguousarray(ys[has_coords])
+    lons = np.ascontiguousarray(xs[has_coords])
+
+    if missing_coords > 0:
+        print(f"Warning: {missing_coords} nodes missing coordinate data ('x' or 'y').")
+
+    # Extract edges and weights, handling parallel edges by keeping the lowest weight.
+    # reindex yields an all-NaN column if no edge carries the weight attribute.
+    edges = gdf_edges.reindex(columns=[weight_attribute]).reset_index()
+    missing = edges[weight_attribute].isna().to_numpy()
+    missing_weights = int(missing.sum())
+    edges = (
+        edges.loc[~missing]
+        .groupby(["u", "v"], as_index=False, sort=True)[weight_attribute]
+        .min()
+    )
+
+    if missing_weights > 0:
+        print(
+            f"Warning: Skipped {missing_weights} edges missing weight attribute '{weight_attribute}'."
+        )
+
+    # Map both endpoints to rows in one vectorized lookup (-1: node has no coordinates)
+    src = node_index.get_indexer(edges["u"])
+    dst = node_index.get_indexer(edges["v"])
+    keep = (src >= 0) & (dst >= 0)
+    src = src[keep]
+
+    # Count edges per source row and prefix-sum into indptr, then fill the edge arrays
+    # in row order (a stable sort keeps each row's targets in ascending order)
+    order = np.argsort(src, kind="stable")
+    indptr = np.zeros(len(ids) + 1, dtype=np.int64)
+    np.cumsum(np.bincount(src, minlength=len(ids)), out=indptr[1:])
+    # Row positions fit in 32 bits for any real road network, halving the largest array
+    # (forcecast widens it in RoadNetwork.from_csr); weights and coordinates stay float64
+    index_dtype = np.uint32 if len(ids) <= np.iinfo(np.uint32).max else np.int64
+    indices = dst[keep][order].astype(index_dtype)
+    weights = edges[weight_attribute].to_numpy(dtype=np.float64)[keep][order]
+
+    return indptr, indices, weights, lats, lons, ids
+
+
+def save_csr_arrays(npz_path, arrays, weight_attribute):
+    """Saves the arrays returned by graph_to_csr to npz_path under CSR_ARRAY_NAMES.
+
+    weight_attribute is stored alongside (as CSR_WEIGHT_KEY), so readers can tell a
+    cache built with a different edge weight from a valid one.
+    """
+    np.savez(
+        npz_path,
+        **dict(zip(CSR_ARRAY_NAMES, arrays)),
+        **{CSR_WEIGHT_KEY: np.array(weight_attribute)},
+    )
+
+
+def read_csr_arrays(npz_path, weight_attribute):
+    """Reads the arrays written by save_csr_arrays, in CSR_ARRAY_NAMES order.
+
+    Returns None if the cache was built from a different weight attribute (or does
+    not record one), so callers treat it as a cache miss.
+    """
+    with np.load(npz_path) as cached:
+        if (
+            CSR_WEIGHT_KEY not in cached.files
+            or str(cached[CSR_WEIGHT_KEY]) != weight_attribute
+        ):
+            return None
+        return tuple(cached[name] for name in CSR_ARRAY_NAMES)
@@ -37,6 +37,12 @@ namespace AStar {
 
     std::vector<long long> search(const RoadNetwork &network,
                                         long long start_node_id, long long goal_node_id);
+
+    // Bidirectional A*: searches forward from the start and backward from the goal
+    // (over incoming edges) and stops once neither frontier can improve the best
+    // meeting path found so far.
+    std::vector<long long> bidirectional_search(const RoadNetwork &network,
+                                        long long start_node_id, long long goal_node_id);
 } 
 
 namespace AStarParallel {
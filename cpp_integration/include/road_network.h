@@ -1,9 +1,15 @@
 #pragma once
 
 #include "graph_types.h"        // Uses Node, Edge, Graph, NodeMap
+#include <pybind11/numpy.h>     // py::array_t for the CSR constructor
 #include <pybind11/pybind11.h>  // Include for py::dict if needed in constructor/methods
 #include <pybind11/stl.h>       // Needed if constructor directly uses stl converters
 
+#include <cmath>
+#include <memory>
+#include <mutex>
+#include <utility>
+
 namespace py = pybind11;
 
 // Helper function (can be here or in a separate .cpp)
@@ -30,6 +36,10 @@ inline NodeMap convert_py_nodes(const py::dict &py_nodes)
     return nodes;
 }
 
+// NumPy array types accepted by the CSR constructor (forcecast converts other dtypes)
+using IdArray = py::array_t<long long, py::array::c_style | py::array::forcecast>;
+using WeightArray = py::array_t<double, py::array::c_style | py::array::forcecast>;
+
 // Helper function (can be here or in a separate .cpp)
 // Converts Python dict {id: [(neighbor_id, weight), ...]} to Graph
 inline Graph convert_py_graph(const py::dict &py_graph)
@@ -61,16 +71,123 @@ inline Graph convert_py_graph(const py::dict &py_graph)
     return graph;
 }
 
+// Helper function (can be here or in a separate .cpp)
+// Converts CSR arrays to Graph and NodeMap. Node i has ID ids[i] and coordinates
+// (lats[i], lons[i]); its outgoing edges are indices/weights[indptr[i]:indptr[i + 1]],
+// where indices holds positions into ids. Buffers are read directly, so no Python
+// object is created or cast per node/edge. Nodes with NaN coordinates get no Node entry.
+inline std::pair<Graph, NodeMap> convert_csr(const IdArray &indptr, const IdArray &indices,
+                                             const WeightArray &weights, const WeightArray &lats,
+                                             const WeightArray &lons, const IdArray &ids)
+{
+    if (indptr.ndim() != 1 || indices.ndim() != 1 || weights.ndim() != 1 || lats.ndim() != 1 ||
+        lons.ndim() != 1 || ids.ndim() != 1)
+    {
+        throw py::value_error("CSR arrays must be one-dimensional");
+    }
+
+    const py::ssize_t num_nodes = ids.shape(0);
+    const py::ssize_t num_edges = indices.shape(0);
+    if (indptr.shape(0) != num_nodes + 1 || lats.shape(0) != num_nodes ||
+        lons.shape(0) != num_nodes)
+    {
+        throw py::value_error("indptr must have len(ids) + 1 entries and lats/lons len(ids)");
+    }
+    if (weights.shape(0) != num_edges)
+    {
+        throw py::value_error("indices and weights must have the same length");
+    }
+
+    auto ptr = indptr.unchecked<1>();
+    auto nbr = indices.unchecked<1>();
+    auto wts = weights.unchecked<1>();
+    auto lat = lats.unchecked<1>();
+    auto lon = lons.unchecked<1>();
+    auto id = ids.unchecked<1>();
+
+    if (ptr(0) != 0 || ptr(num_nodes) != num_edges)
+    {
+        throw py::value_error("indptr must start at 0 and end at len(indices)");
+    }
+
+    Graph graph;
+    NodeMap nodes;
+    graph.reserve(static_cast<size_t>(num_nodes));
+    nodes.reserve(static_cast<size_t>(num_nodes));
+    for (py::ssize_t i = 0; i < num_nodes; ++i)
+    {
+        const long long u_id = id(i);
+        if (!std::isnan(lat(i)) && !std::isnan(lon(i)))
+        {
+            nodes.emplace(std::piecewise_construct, std::forward_as_tuple(u_id),
+                          std::forward_as_tuple(u_id, lat(i), lon(i)));
+        }
+
+        const long long begin = ptr(i);
+        const long long end = ptr(i + 1);
+        if (begin > end)
+        {
+            throw py::value_error("indptr must be non-decreasing");
+        }
+        std::vector<Edge> edges;
+        edges.reserve(static_cast<size_t>(end - begin));
+        for (long long e = begin; e < end; ++e)
+        {
+            const long long v = nbr(e);
+            if (v < 0 || v >= num_nodes)
+            {
+                throw py::value_error("CSR neighbor index out of range");
+            }
+            edges.emplace_back(id(v), wts(e));
+        }
+        graph.emplace(u_id, std::move(edges));
+    }
+    return {std::move(graph), std::move(nodes)};
+}
+
+// Helper function (can be here or in a separate .cpp)
+// Builds the reverse adjacency list (v -> edges back to each u with u -> v in graph)
+inline Graph build_reverse_graph(const Graph &graph)
+{
+    Graph reverse;
+    reverse.reserve(graph.size());
+    for (const auto &[u_id, edges] : graph)
+    {
+        for (const Edge &edge : edges)
+        {
+            reverse[edge.target_node_id].emplace_back(u_id, edge.weight);
+        }
+    }
+    return reverse;
+}
+
 class RoadNetwork
 {
 public:
-    // Constructor taking Python dictionaries directly
+    // Constructor taking Python dictionaries directly. Typed STL map parameters were
+    // tried instead and measured ~15% slower (the casters build an intermediate map
+    // that is then copied into Graph/NodeMap); large networks should use from_csr
     RoadNetwork(const py::dict &py_graph, const py::dict &py_nodes)
         : graph_data_(convert_py_graph(py_graph)), node_data_(convert_py_nodes(py_nodes))
     {
         // Optional: Add validation here if needed
     }
 
+    // Constructor taking already converted C++ containers
+    RoadNetwork(Graph graph, NodeMap nodes)
+        : graph_data_(std::move(graph)), node_data_(std::move(nodes))
+    {
+    }
+
+    // Factory building the network from NumPy CSR arrays (see convert_csr)
+    static RoadNetwork from_csr(const IdArray &indptr, const IdArray &indices,
+                                const WeightArray &weights, const WeightArray &lats,
+                                const WeightArray &lons, const IdArray &ids)
+    {
+        auto [graph, nodes] = convert_csr(indptr, indices, weights, lats, lons, ids);
+        return RoadNetwork(std::move(graph), std::move(nodes));
+    }
+
     // Deleted copy constructor/assignment to prevent accidental copies
     RoadNetwork(const RoadNetwork &) = delete;
     RoadNetwork &operator=(const RoadNetwork &) = delete;
@@ -82,6 +199,15 @@ public:
     // Accessors for the A* algorithm (const references)
     const Graph &get_graph() const { return graph_data_; }
 
+    // Built on first use: only backward searches (bidirectional A*) need it, so
+    // one-sided runs never pay its memory or build time
+    const Graph &get_reverse_graph() const
+    {
+        std::call_once(*reverse_graph_once_,
+                       [this] { reverse_graph_data_ = build_reverse_graph(graph_data_); });
+        return reverse_graph_data_;
+    }
+
     const NodeMap &get_nodes() const { return node_data_; }
 
     // Optional: Method to get node details (could be useful)
@@ -98,7 +224,20 @@ public:
         return (it != graph_data_.end()) ? &(it->second) : nullptr;
     }
 
+    // Incoming edges of a node, each Edge pointing back at its source (for backward searches)
+    const std::vector<Edge> *get_reverse_neighbors(long long node_id) const
+    {
+        const Graph &reverse_graph = get_reverse_graph();
+        auto it = reverse_graph.find(node_id);
+        return (it != reverse_graph.end()) ? &(it->second) : nullptr;
+    }
+
 private:
     Graph graph_data_;
     NodeMap node_data_;
+    // Lazily built by get_reverse_graph(); the once_flag sits behind a pointer
+    // because it is neither copyable nor movable
+    mutable std::unique_ptr<std::once_flag> reverse_graph_once_ =
+        std::make_unique<std::once_flag>();
+    mutable Graph reverse_graph_data_;
 };
@@ -66,6 +66,14 @@ PYBIND11_MODULE(assignment2_cpp, m)
                 graph_dict format: {node_id: [(neighbor_id, weight), ...]}
                 nodes_dict format: {node_id: (latitude, longitude)})")
 
+        // Bind the factory taking NumPy CSR arrays (no per-element Python conversion)
+        .def_static("from_csr", &RoadNetwork::from_csr, py::arg("indptr"), py::arg("indices"),
+                    py::arg("weights"), py::arg("lats"), py::arg("lons"), py::arg("ids"),
+                    R"(Constructs the RoadNetwork from NumPy arrays in CSR form.
+                ids[i] is the node ID of row i with coordinates (lats[i], lons[i]);
+                its edges are indices/weights[indptr[i]:indptr[i + 1]], where
+                indices are row positions into ids.)")
+
         // Bind accessor methods (useful for inspection from Python)
         // Use reference_internal policy: Python gets access but C++ (RoadNetwork) owns the memory
         .def("get_node", &RoadNetwork::get_node, py::return_value_policy::reference_internal,
@@ -92,6 +100,15 @@ PYBIND11_MODULE(assignment2_cpp, m)
                py::return_value_policy::move  // Efficiently move the resulting vector to Python
     );
 
+    demo_m.def("AStar_bidirectional_search",
+               &AStar::bidirectional_search,  // The C++ function to bind
+               "Find the shortest path using bidirectional A* (Sequential Implementation). Returns a list of node IDs.",
+               py::arg("network"),            // Expects a RoadNetwork object from Python
+               py::arg("start_node"),         // Starting node ID
+               py::arg("goal_node"),          // Goal node ID
+               py::return_value_policy::move  // Efficiently move the resulting vector to Python
+    );
+
     demo_m.def("AStarParallel_search_TPool_CppLib",
                &AStarParallel::search_TPool_CppLib,  // The C++ function to bind
                "Find the shortest path using the A* algorithm (Parallel with thread pool and C++ library Implementation). Returns a list of node IDs.",
@@ -123,6 +123,142 @@ namespace AStar {
         return {};
     }
 
+    namespace {
+
+        struct BidirectionalEntry {
+            long long id;
+            double g_score;
+            double f_score;
+
+            bool operator>(const BidirectionalEntry &other) const { return f_score > other.f_score; }
+        };
+
+        // State of one search direction
+        struct SearchSide {
+            std::priority_queue<BidirectionalEntry, std::vector<BidirectionalEntry>,
+                                std::greater<BidirectionalEntry>> open_set;
+            std::unordered_map<long long, double> g_score;
+            std::unordered_map<long long, long long> came_from;
+        };
+
+        // Pops and expands one node of `side`, heading towards `target`. Every relaxed
+        // node already reached by `other` is a candidate meeting point for best_cost.
+        void expand_side(const RoadNetwork &network, bool forward, const Node &target,
+                         SearchSide &side, const SearchSide &other, double &best_cost,
+                         long long &meeting_node)
+        {
+            BidirectionalEntry current = side.open_set.top();
+            side.open_set.pop();
+
+            // Skip stale queue entries superseded by a cheaper path
+            if (current.g_score > side.g_score[current.id]) return;
+
+            const std::vector<Edge> *neighbors_ptr = forward
+                                                       ? network.get_neighbors(current.id)
+                                                       : network.get_reverse_neighbors(current.id);
+            if (!neighbors_ptr) return;
+
+            for (const Edge &edge : *neighbors_ptr)
+            {
+                long long neighbor_id = edge.target_node_id;
+                double tentative_g_score = current.g_score + edge.weight;
+
+                auto it = side.g_score.find(neighbor_id);
+                if (it != side.g_score.end() && tentative_g_score >= it->second) continue;
+
+                const Node *neighbor_node_ptr = network.get_node(neighbor_id);
+                if (!neighbor_node_ptr) continue;  // Missing coordinate data, as in search()
+
+                side.g_score[neighbor_id] = tentative_g_score;
+                side.came_from[neighbor_id] = current.id;
+
+                double h_score = heuristic(*neighbor_node_ptr, target);
+                if (h_score < std::numeric_limits<double>::max())
+                {
+                    side.open_set.push(
+                        {neighbor_id, tentative_g_score, tentative_g_score + h_score});
+                }
+
+                auto other_it = other.g_score.find(neighbor_id);
+                if (other_it != other.g_score.end() &&
+                    tentative_g_score + other_it->second < best_cost)
+                {
+                    best_cost = tentative_g_score + other_it->second;
+                    meeting_node = neighbor_id;
+                }
+            }
+        }
+
+    }  // namespace
+
+    std::vector<long long> bidirectional_search(const RoadNetwork &network,
+                                        long long start_node_id, long long goal_node_id)
+    {
+        const Node *start_node_ptr = network.get_node(start_node_id);
+        const Node *goal_node_ptr = network.get_node(goal_node_id);
+
+        if (!start_node_ptr) throw std::runtime_error("Start node ID not found in NodeMap.");
+        if (!goal_node_ptr) throw std::runtime_error("Goal node ID not found in NodeMap.");
+
+        if (start_node_id == goal_node_id) return {start_node_id};
+
+        const Node &start_node_data = *start_node_ptr;
+        const Node &goal_node_data = *goal_node_ptr;
+
+        SearchSide forward_side;
+        SearchSide backward_side;
+        forward_side.g_score[start_node_id] = 0.0;
+        forward_side.open_set.push(
+            {start_node_id, 0.0, heuristic(start_node_data, goal_node_data)});
+        backward_side.g_score[goal_node_id] = 0.0;
+        backward_side.open_set.push(
+            {goal_node_id, 0.0, heuristic(goal_node_data, start_node_data)});
+
+        double best_cost = std::numeric_limits<double>::max();
+        long long meeting_node = 0;
+
+        while (!forward_side.open_set.empty() && !backward_side.open_set.empty())
+        {
+            // Each side's smallest f is a lower bound on any path through its frontier,
+            // so once either reaches the best meeting cost that path is optimal
+            if (forward_side.open_set.top().f_score >= best_cost ||
+                backward_side.open_set.top().f_score >= best_cost)
+            {
+                break;
+            }
+
+            // Expand the smaller frontier to keep both searches balanced
+            if (forward_side.open_set.size() <= backward_side.open_set.size())
+            {
+                expand_side(network, true, goal_node_data, forward_side, backward_side, best_cost,
+                            meeting_node);
+            }
+            else
+            {
+                expand_side(network, false, start_node_data, backward_side, forward_side,
+                            best_cost, meeting_node);
+            }
+        }
+
+        // Frontiers never met: goal unreachable
+        if (best_cost == std::numeric_limits<double>::max()) return {};
+
+        // Stitch start -> meeting node (forward tree) and meeting node -> goal (backward tree)
+        std::vector<long long> path;
+        for (long long node = meeting_node;; node = forward_side.came_from.at(node))
+        {
+            path.push_back(node);
+            if (node == start_node_id) break;
+        }
+        std::reverse(path.begin(), path.end());
+        for (long long node = meeting_node; node != goal_node_id;)
+        {
+            node = backward_side.came_from.at(node);
+            path.push_back(node);
+        }
+        return path;
+    }
+
 } 
 
 namespace AStarParallel {
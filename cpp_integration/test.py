@@ -1,9 +1,19 @@
 import sys
+import argparse
+import logging
 import os
 import time
-import random
-import networkx as nx
-import osmnx as ox
+import math
+import pickle
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+
+from csr_cache import graph_to_csr
+
+try:
+    from numba import njit
+except ImportError:  # Numba is optional; the heuristic falls back to plain Python
+    njit = None
 
 # --- Configuration ---
 SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
@@ -13,8 +23,16 @@ GRAPHML_PATH = os.path.abspath(
     os.path.join(SCRIPT_DIR, "..", "osm_data", GRAPHML_FILENAME)
 )
 WEIGHT_ATTRIBUTE = "length"  # Edge attribute used for pathfinding weight
+EARTH_RADIUS_M = 6_371_009  # Same radius as osmnx.distance.great_circle
 # Default CMake preset name to look for the build artifacts
 DEFAULT_PRESET_NAME = "release"
+# C++ search functions (in the 'demo' submodule) selectable with --algo
+CPP_SEARCH_FUNCTIONS = {
+    "astar": "AStar_search",
+    "bi-astar": "AStar_bidirectional_search",
+}
+
+log = logging.getLogger(__name__)
 
 
 # --- Helper: Add Build Directory to Path ---
@@ -24,14 +42,16 @@ def add_custom_module_path(preset_name=DEFAULT_PRESET_NAME):
     # Construct path based on preset convention: build/<presetName>
     build_dir = os.path.join(script_dir, "build", preset_name)
     if not os.path.isdir(build_dir):
-        print(f"Build directory for preset '{preset_name}' not found at {build_dir}")
-        print(
+        log.warning(
+            f"Build directory for preset '{preset_name}' not found at {build_dir}"
+        )
+        log.warning(
             f"Please build the C++ module using the '{preset_name}' preset first (e.g., using 'cmake --build --preset {preset_name}')."
         )
         # Fallback check for old simple build directory
         old_build_dir = os.path.join(script_dir, "build")
         if os.path.isdir(old_build_dir):
-            print(
+            log.warning(
                 f"Found legacy build directory at {old_build_dir}. Adding it instead, but preset structure is recommended."
             )
             build_dir = old_build_dir
@@ -39,239 +59,611 @@ def add_custom_module_path(preset_name=DEFAULT_PRESET_NAME):
             sys.exit(1)
 
     sys.path.insert(0, build_dir)
-    print(f"Added build directory to path: {build_dir}")
+    log.info(f"Added build directory to path: {build_dir}")
 
 
 # --- Helper: Load Graph ---
-def load_graph_from_graphml(graphml_path):
-    """Loads a NetworkX graph from a GraphML file using osmnx."""
-    print(f"Loading road network from '{graphml_path}'...")
+def load_graph_from_graphml(graphml_path, use_cache=True):
+    """Loads a NetworkX graph from a GraphML file using osmnx.
+
+    With use_cache, the parsed graph is pickled next to the GraphML file and that
+    pickle is loaded instead on later runs, as long as it is newer than the GraphML.
+    """
+    import osmnx as ox  # Imported lazily; osmnx pulls in geopandas/shapely/pyproj
+
+    log.info(f"Loading road network from '{graphml_path}'...")
     if not os.path.exists(graphml_path):
-        print(f"Error: GraphML file not found at '{graphml_path}'")
-        print("Please ensure the file exists or specify the correct path.")
+        log.error(f"Error: GraphML file not found at '{graphml_path}'")
+        log.error("Please ensure the file exists or specify the correct path.")
         sys.exit(1)
 
+    cache_path = graphml_path + ".pkl"
     start_time = time.time()
+    if (
+        use_cache
+        and os.path.exists(cache_path)
+        and os.path.getmtime(cache_path) >= os.path.getmtime(graphml_path)
+    ):
+        try:
+            with open(cache_path, "rb") as f:
+                G_nx = pickle.load(f)
+            log.info(
+                f"Network loaded from cache '{cache_path}' in {time.time() - start_time:.2f} seconds."
+            )
+            log.info(
+                f"Network has {G_nx.number_of_nodes()} nodes and {G_nx.number_of_edges()} edges."
+            )
+            return G_nx
+        except Exception as e:
+            log.warning(f"Warning: Could not load cached graph '{cache_path}': {e}")
+            start_time = time.time()
+
     try:
-        G_nx = ox.load_graphml(graphml_path)
-        print(f"Network loaded from GraphML in {time.time() - start_time:.2f} seconds.")
-        print(
+        # load_graphml converts its known edge attributes ("length", "travel_time",
+        # ...) from text; listing the weight covers a custom WEIGHT_ATTRIBUTE too
+        G_nx = ox.load_graphml(graphml_path, edge_dtypes={WEIGHT_ATTRIBUTE: float})
+        log.info(
+            f"Network loaded from GraphML in {time.time() - start_time:.2f} seconds."
+        )
+        log.info(
             f"Network has {G_nx.number_of_nodes()} nodes and {G_nx.number_of_edges()} edges."
         )
-        return G_nx
     except Exception as e:
-        print(f"Error loading GraphML file '{graphml_path}': {e}")
+        log.error(f"Error loading GraphML file '{graphml_path}': {e}")
         sys.exit(1)
 
+    if use_cache:
+        try:
+            with open(cache_path, "wb") as f:
+                pickle.dump(G_nx, f, protocol=pickle.HIGHEST_PROTOCOL)
+            log.info(f"Cached parsed graph to '{cache_path}'.")
+        except OSError as e:
+            log.warning(f"Warning: Could not write graph cache '{cache_path}': {e}")
+    return G_nx
+
 
 # --- Helper: Prepare Data for C++ Module ---
 def prepare_cpp_data(G_nx, weight_attribute):
-    """Converts NetworkX graph data to dictionaries suitable for the C++ module."""
-    print("Preparing data for C++ module...")
+    """Converts NetworkX graph data to CSR arrays for RoadNetwork.from_csr.
+
+    Returns (indptr, indices, weights, lats, lons, ids) as built by
+    csr_cache.graph_to_csr, which documents the layout.
+    """
+    log.info("Preparing data for C++ module...")
     start_time = time.time()
-    nodes_dict = {}
-    graph_dict = {}
-    missing_coords = 0
-    missing_weights = 0
-
-    # Extract node coordinates
-    for node, data in G_nx.nodes(data=True):
-        if "y" in data and "x" in data:
-            nodes_dict[node] = (data["y"], data["x"])  # (lat, lon)
-        else:
-            missing_coords += 1
-
-    if missing_coords > 0:
-        print(f"Warning: {missing_coords} nodes missing coordinate data ('x' or 'y').")
-
-    # Extract edges and weights, handling parallel edges by keeping the lowest weight
-    for u, v, data in G_nx.edges(data=True):
-        weight = data.get(weight_attribute)
-        if weight is None:
-            missing_weights += 1
-            continue
-
-        if u not in graph_dict:
-            graph_dict[u] = []
-
-        # Check if edge (u, v) already exists; update if new weight is lower
-        found = False
-        for i, (target, existing_weight) in enumerate(graph_dict[u]):
-            if target == v:
-                if weight < existing_weight:
-                    graph_dict[u][i] = (v, weight)
-                found = True
-                break
-        if not found:
-            graph_dict[u].append((v, weight))
-
-    if missing_weights > 0:
-        print(
-            f"Warning: Skipped {missing_weights} edges missing weight attribute '{weight_attribute}'."
-        )
 
-    # Ensure all nodes from nodes_dict exist as keys in graph_dict (even if no outgoing edges)
-    for node_id in nodes_dict:
-        if node_id not in graph_dict:
-            graph_dict[node_id] = []
+    arrays = graph_to_csr(G_nx, weight_attribute)
+
+    log.info(f"Data preparation finished in {time.time() - start_time:.2f} seconds.")
+    return arrays
+
+
+# --- Helper: Build Deduplicated NetworkX Graph ---
+def build_simple_nx_graph(indptr, indices, weights, weight_attribute):
+    """Builds a DiGraph with the same deduplicated topology handed to the C++ module.
+
+    Nodes are the dense CSR row indices 0..N-1 rather than OSM IDs, so the heuristic
+    can index coordinate arrays directly. networkx.astar_path on a MultiDiGraph also
+    takes min() over parallel edges on every neighbor expansion; the CSR arrays already
+    hold at most one edge per (u, v).
+    """
+    import networkx as nx
+
+    num_nodes = len(indptr) - 1
+    sources = np.repeat(np.arange(num_nodes, dtype=np.int64), np.diff(indptr))
+    G_simple = nx.DiGraph()
+    G_simple.add_nodes_from(range(num_nodes))
+    G_simple.add_weighted_edges_from(
+        zip(sources.tolist(), indices.tolist(), weights.tolist()),
+        weight=weight_attribute,
+    )
+    return G_simple
+
 
-    print(f"Data preparation finished in {time.time() - start_time:.2f} seconds.")
-    return nodes_dict, graph_dict
+# --- Helper: Sample Random Start/End Pairs ---
+def sample_node_pairs(ids, num_pairs, rng):
+    """Draws num_pairs (start, end) node pairs with start != end in one vectorized pass."""
+    picks = rng.integers(0, len(ids), size=(num_pairs, 2))
+    same = picks[:, 0] == picks[:, 1]
+    while same.any():  # Resample only the colliding end nodes
+        picks[same, 1] = rng.integers(0, len(ids), size=int(same.sum()))
+        same = picks[:, 0] == picks[:, 1]
+    return [tuple(pair) for pair in ids[picks].tolist()]
 
 
 # --- Helper: Run C++ A* Search ---
-def run_cpp_astar(cpp_module, cpp_network, start_node, end_node):
+def run_cpp_astar(cpp_module, cpp_network, start_node, end_node, algo="astar"):
     """Runs the C++ A* implementation and returns the path and execution time."""
-    print("\nRunning C++ A* implementation...")
-    start_time = time.time()
+    log.info(f"\nRunning C++ A* implementation ({algo})...")
+    # Access the function within the 'demo' submodule
+    search_func = getattr(cpp_module.demo, CPP_SEARCH_FUNCTIONS[algo])
+    start_time = time.perf_counter_ns()
     cpp_path = None
     try:
-        # Access the function within the 'demo' submodule
-        cpp_path = cpp_module.demo.astar_search_demo(cpp_network, start_node, end_node)
-        cpp_time = time.time() - start_time
+        cpp_path = search_func(cpp_network, start_node, end_node)
+        cpp_time = (time.perf_counter_ns() - start_time) / 1e9
         if not cpp_path:  # C++ returns empty list [] if no path
-            print(f"C++ A*: No path found in {cpp_time:.4f} seconds.")
+            log.info(f"C++ A*: No path found in {cpp_time:.4f} seconds.")
         else:
-            print(
+            log.info(
                 f"C++ A* found path (length {len(cpp_path)}) in {cpp_time:.4f} seconds."
             )
     except Exception as e:
-        print(f"Error running C++ A*: {e}")
+        log.error(f"Error running C++ A*: {e}")
         cpp_time = float("inf")  # Indicate failure
         cpp_path = None  # Ensure path is None on error
     return cpp_path, cpp_time
 
 
 # --- Helper: Define Heuristic for NetworkX ---
-def nx_heuristic(u, v, G_nx):
-    """Heuristic function (Haversine distance) for networkx.astar_path."""
-    try:
-        u_coords = G_nx.nodes[u]
-        v_coords = G_nx.nodes[v]
-        # Use osmnx great_circle which expects (lat, lon)
-        return ox.distance.great_circle(
-            u_coords["y"], u_coords["x"], v_coords["y"], v_coords["x"]
-        )
-    except KeyError as e:
-        print(f"Error: Node {e} missing coordinate data ('x' or 'y') for heuristic.")
-        return float("inf")  # Return infinity if data is missing
+def _haversine_idx(i, j, lat, lon):
+    """Great-circle distance in meters between entries i and j of radian lat/lon arrays."""
+    dlat = lat[j] - lat[i]
+    dlon = lon[j] - lon[i]
+    a = (
+        math.sin(dlat * 0.5) ** 2
+        + math.cos(lat[i]) * math.cos(lat[j]) * math.sin(dlon * 0.5) ** 2
+    )
+    return EARTH_RADIUS_M * 2.0 * math.asin(math.sqrt(a))
+
+
+if njit is not None:
+    _haversine_idx = njit(cache=True, fastmath=True)(_haversine_idx)
+
+
+def build_nx_heuristic(lats, lons):
+    """Builds the Haversine heuristic for networkx.astar_path over dense node indices.
+
+    lats/lons are the CSR coordinate columns in degrees, so a node's coordinates are
+    read by position instead of hashing its OSM ID.
+    """
+    lat = np.radians(lats)
+    lon = np.radians(lons)
+    if njit is None:
+        # Without Numba, scalar math on plain lists beats indexing NumPy arrays
+        lat, lon = lat.tolist(), lon.tolist()
+    else:
+        # Trigger JIT compilation outside any timed section
+        _haversine_idx(0, 0, lat, lon)
+
+    def nx_heuristic(u, v):
+        return _haversine_idx(u, v, lat, lon)
+
+    return nx_heuristic
 
 
 # --- Helper: Run NetworkX A* Search ---
-def run_nx_astar(G_nx, start_node, end_node, weight_attribute):
-    """Runs the NetworkX A* implementation and returns the path and execution time."""
-    print("\nRunning NetworkX A* implementation...")
-    start_time = time.time()
+def run_nx_astar(
+    G_nx, start_node, end_node, weight_attribute, heuristic, cost_only=False
+):
+    """Runs the NetworkX A* implementation and returns the path and execution time.
+
+    With cost_only, networkx.astar_path_length is used instead and the path cost is
+    returned in place of the path, so no node list is built.
+    """
+    import networkx as nx
+
+    log.info("\nRunning NetworkX A* implementation...")
+    search_func = nx.astar_path_length if cost_only else nx.astar_path
+    start_time = time.perf_counter_ns()
     nx_path = None
     try:
-        # Pass the heuristic function correctly, using a lambda to include G_nx
-        nx_path = nx.astar_path(
+        nx_path = search_func(
             G_nx,
             start_node,
             end_node,
             weight=weight_attribute,
-            heuristic=lambda u, v: nx_heuristic(u, v, G_nx),  # Pass G_nx context
-        )
-        nx_time = time.time() - start_time
-        print(
-            f"NetworkX A* found path (length {len(nx_path)}) in {nx_time:.4f} seconds."
+            heuristic=heuristic,
         )
+        nx_time = (time.perf_counter_ns() - start_time) / 1e9
+        if cost_only:
+            log.info(
+                f"NetworkX A* found path (cost {nx_path:.2f}) in {nx_time:.4f} seconds."
+            )
+        else:
+            log.info(
+                f"NetworkX A* found path (length {len(nx_path)}) in {nx_time:.4f} seconds."
+            )
     except nx.NetworkXNoPath:
-        nx_time = time.time() - start_time
-        print(f"NetworkX A*: No path found in {nx_time:.4f} seconds.")
+        nx_time = (time.perf_counter_ns() - start_time) / 1e9
+        log.info(f"NetworkX A*: No path found in {nx_time:.4f} seconds.")
         nx_path = None  # Ensure path is None
     except Exception as e:
-        print(f"Error running NetworkX A*: {e}")
+        log.error(f"Error running NetworkX A*: {e}")
         nx_time = float("inf")  # Indicate failure
         nx_path = None  # Ensure path is None on error
     return nx_path, nx_time
 
 
+# --- Helper: Warm-Up Queries ---
+def run_warmup(
+    cpp_search,
+    cpp_network,
+    G_simple,
+    heuristic,
+    pairs,
+    index_of,
+    weight_attribute,
+    cost_only=False,
+):
+    """Runs untimed queries so caches (and the NetworkX side) are warm before measuring.
+
+    NetworkX is only warmed here when it runs in this process (heuristic given);
+    worker processes warm themselves up in _init_nx_worker.
+    """
+    for start_node, end_node in pairs:
+        try:
+            cpp_search(cpp_network, start_node, end_node)
+        except Exception:
+            pass  # Failures are reported by the measured runs
+    if G_simple is not None and heuristic is not None:
+        warm_up_nx(
+            G_simple,
+            heuristic,
+            [(index_of[s], index_of[t]) for s, t in pairs],
+            weight_attribute,
+            cost_only,
+        )
+
+
+def warm_up_nx(G_simple, heuristic, index_pairs, weight_attribute, cost_only=False):
+    """Runs untimed NetworkX A* queries over dense node index pairs."""
+    import networkx as nx
+
+    nx_search = nx.astar_path_length if cost_only else nx.astar_path
+    for start_node, end_node in index_pairs:
+        try:
+            nx_search(
+                G_simple,
+                start_node,
+                end_node,
+                weight=weight_attribute,
+                heuristic=heuristic,
+            )
+        except nx.NetworkXException:
+            pass  # Failures are reported by the measured runs
+
+
+# --- Helper: Run NetworkX A* Queries in Worker Processes ---
+_worker_graph = None
+_worker_heuristic = None
+_worker_cost_only = False
+
+
+def _init_nx_worker(G_simple, lats, lons, cost_only, warmup_pairs):
+    """Stores the graph, builds the heuristic and runs the warm-up once per worker.
+
+    Each worker is a fresh process, so warm-up queries run in the parent would not
+    help it; every worker runs all warmup_pairs itself before taking measured queries.
+    """
+    global _worker_graph, _worker_heuristic, _worker_cost_only
+    _worker_graph = G_simple
+    _worker_heuristic = build_nx_heuristic(lats, lons)
+    _worker_cost_only = cost_only
+    warm_up_nx(G_simple, _worker_heuristic, warmup_pairs, WEIGHT_ATTRIBUTE, cost_only)
+
+
+def _nx_one(pair):
+    """Runs a single NetworkX A* query against the worker's graph."""
+    start_node, end_node = pair
+    return run_nx_astar(
+        _worker_graph,
+        start_node,
+        end_node,
+        WEIGHT_ATTRIBUTE,
+        _worker_heuristic,
+        _worker_cost_only,
+    )
+
+
+def run_nx_astar_batch(
+    pairs, G_simple, lats, lons, num_workers, cost_only=False, warmup_pairs=()
+):
+    """Runs NetworkX A* for every (start, end) index pair across a pool of processes.
+
+    warmup_pairs (index pairs) are run untimed in every worker before its first query.
+    """
+    with ProcessPoolExecutor(
+        max_workers=num_workers,
+        initializer=_init_nx_worker,
+        initargs=(G_simple, lats, lons, cost_only, list(warmup_pairs)),
+    ) as executor:
+        return list(executor.map(_nx_one, pairs))
+
+
 # --- Helper: Compare Results ---
-def compare_results(cpp_path, cpp_time, nx_path, nx_time, G_nx, weight_attribute):
-    """Compares the paths and timings from both implementations."""
-    print("\n--- Comparison ---")
-    print(f"C++ Time: {cpp_time:.4f} s")
-    print(f"NX Time:  {nx_time:.4f} s")
+def compare_results(
+    cpp_path, cpp_time, nx_path, nx_time, G_nx, weight_attribute, cost_only=False
+):
+    """Compares the paths and timings from both implementations.
+
+    With cost_only, nx_path holds the NetworkX path cost (None if it found no path)
+    and the C++ path is checked against it by cost alone.
+    """
+    import networkx as nx
+
+    log.info("\n--- Comparison ---")
+    log.info(f"C++ Time: {cpp_time:.4f} s")
+
+    # NetworkX reference run skipped (--no-reference): only report the C++ result
+    if math.isnan(nx_time):
+        log.info("NX Time:  skipped (--no-reference)")
+        if cpp_path:
+            log.info(f"C++ Path Length: {len(cpp_path)}")
+            try:
+                path_cost = nx.path_weight(G_nx, cpp_path, weight=weight_attribute)
+                log.info(f"Path cost (using '{weight_attribute}'): {path_cost:.2f}")
+            except Exception as e:
+                log.warning(f"Could not calculate path cost: {e}")
+        else:
+            log.info("C++ implementation found no path.")
+        return
+
+    log.info(f"NX Time:  {nx_time:.4f} s")
+
+    # NetworkX ran with --cost-only: compare path costs instead of node lists
+    if cost_only and cpp_path and nx_path is not None:
+        try:
+            path_cost = nx.path_weight(G_nx, cpp_path, weight=weight_attribute)
+        except Exception as e:
+            log.warning(f"Could not calculate path cost: {e}")
+            return
+        if math.isclose(path_cost, nx_path, rel_tol=1e-9):
+            log.info(f"Path costs match (using '{weight_attribute}'): {path_cost:.2f}")
+        else:
+            log.warning("Path costs DIFFER:")
+            log.warning(f"  C++ Path cost: {path_cost:.2f}")
+            log.warning(f"  NX Path cost:  {nx_path:.2f}")
+        return
 
     # Check if both found a path (cpp_path is non-empty list, nx_path is not None)
     if cpp_path and nx_path is not None:
         if cpp_path == nx_path:
-            print("Paths are identical.")
+            log.info("Paths are identical.")
             try:
                 path_cost = nx.path_weight(G_nx, cpp_path, weight=weight_attribute)
-                print(f"Path cost (using '{weight_attribute}'): {path_cost:.2f}")
+                log.info(f"Path cost (using '{weight_attribute}'): {path_cost:.2f}")
             except Exception as e:
-                print(f"Could not calculate path cost: {e}")
+                log.warning(f"Could not calculate path cost: {e}")
         else:
-            print("Paths DIFFER:")
-            print(f"  C++ Path Length: {len(cpp_path)}")
-            print(f"  NX Path Length:  {len(nx_path)}")
+            log.warning("Paths DIFFER:")
+            log.warning(f"  C++ Path Length: {len(cpp_path)}")
+            log.warning(f"  NX Path Length:  {len(nx_path)}")
 
     # Check if NEITHER found a path (cpp_path is empty/None, nx_path is None)
     elif (not cpp_path or cpp_path is None) and nx_path is None:
-        print("Neither implementation found a path.")
+        log.info("Neither implementation found a path.")
 
     # Otherwise, one found a path and the other did not
     else:
-        print("Paths DIFFER: One implementation found a path, the other did not.")
-        print(
+        log.warning("Paths DIFFER: One implementation found a path, the other did not.")
+        log.warning(
             f"  C++ Path found: {'Yes' if cpp_path else 'No'} (Length: {len(cpp_path) if cpp_path else 'N/A'})"
         )
-        print(
-            f"  NX Path found:  {'Yes' if nx_path is not None else 'No'} (Length: {len(nx_path) if nx_path is not None else 'N/A'})"
-        )
+        if cost_only:
+            log.warning(
+                f"  NX Path found:  {'Yes' if nx_path is not None else 'No'} (Cost: {f'{nx_path:.2f}' if nx_path is not None else 'N/A'})"
+            )
+        else:
+            log.warning(
+                f"  NX Path found:  {'Yes' if nx_path is not None else 'No'} (Length: {len(nx_path) if nx_path is not None else 'N/A'})"
+            )
+
+
+# --- Helper: Parse Command-Line Arguments ---
+def parse_args():
+    """Parses command-line options for the comparison run."""
+    parser = argparse.ArgumentParser(
+        description="Compare the C++ A* implementation against NetworkX A*."
+    )
+    parser.add_argument(
+        "--algo",
+        choices=sorted(CPP_SEARCH_FUNCTIONS),
+        default="astar",
+        help="C++ search to run: one-sided A* or bidirectional A*.",
+    )
+    parser.add_argument(
+        "--no-reference",
+        dest="reference",
+        action="store_false",
+        help="Skip the (slow, pure-Python) NetworkX A* reference run.",
+    )
+    parser.add_argument(
+        "--no-cache",
+        dest="cache",
+        action="store_false",
+        help="Always parse the GraphML file instead of using or writing the pickle cache.",
+    )
+    parser.add_argument(
+        "--num-queries",
+        type=int,
+        default=1,
+        help="Number of random (start, end) pairs to run against the loaded graph.",
+    )
+    parser.add_argument(
+        "--cost-only",
+        action="store_true",
+        help="Have NetworkX return only path costs and compare the C++ result by cost.",
+    )
+    parser.add_argument(
+        "-q",
+        "--quiet",
+        action="store_true",
+        help="Only log warnings and errors; the final totals are still printed.",
+    )
+    parser.add_argument(
+        "--warmup",
+        type=int,
+        default=0,
+        help=(
+            "Number of untimed warm-up queries to run before the measured ones "
+            "(with --workers, every worker process runs them too)."
+        ),
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="Number of worker processes for the NetworkX A* reference runs.",
+    )
+    parser.add_argument(
+        "--seed",
+        type=int,
+        default=None,
+        help="Seed for the random (start, end) pair selection, for reproducible runs.",
+    )
+    args = parser.parse_args()
+    if args.num_queries < 1:
+        parser.error("--num-queries must be at least 1")
+    if args.workers < 1:
+        parser.error("--workers must be at least 1")
+    if args.warmup < 0:
+        parser.error("--warmup must not be negative")
+    return args
 
 
 # --- Main Execution Block ---
 def main():
+    args = parse_args()
+    logging.basicConfig(
+        level=logging.WARNING if args.quiet else logging.INFO, format="%(message)s"
+    )
+
     # Setup: Add build dir to path (defaults to 'release' preset)
     # You could modify this to take a command-line argument for the preset name
     add_custom_module_path()
     try:
         import assignment2_cpp
 
-        print(f"Successfully imported C++ module 'assignment2_cpp'")
+        log.info(f"Successfully imported C++ module 'assignment2_cpp'")
     except ImportError as e:
-        print(f"Failed to import 'assignment2_cpp': {e}")
-        print("Make sure the module is built and the path is correct.")
+        log.error(f"Failed to import 'assignment2_cpp': {e}")
+        log.error("Make sure the module is built and the path is correct.")
         sys.exit(1)
 
     # Load graph data
-    G_nx = load_graph_from_graphml(GRAPHML_PATH)
+    G_nx = load_graph_from_graphml(GRAPHML_PATH, use_cache=args.cache)
 
     # Prepare data structures for C++
-    nodes_dict, graph_dict = prepare_cpp_data(G_nx, WEIGHT_ATTRIBUTE)
+    indptr, indices, weights, lats, lons, ids = prepare_cpp_data(G_nx, WEIGHT_ATTRIBUTE)
 
     # Create C++ RoadNetwork object
     try:
-        cpp_road_network = assignment2_cpp.RoadNetwork(graph_dict, nodes_dict)
-        print("C++ RoadNetwork object created successfully.")
+        cpp_road_network = assignment2_cpp.RoadNetwork.from_csr(
+            indptr, indices, weights, lats, lons, ids
+        )
+        log.info("C++ RoadNetwork object created successfully.")
     except Exception as e:
-        print(f"Error creating C++ RoadNetwork object: {e}")
+        log.error(f"Error creating C++ RoadNetwork object: {e}")
         sys.exit(1)
 
-    # Select random start/end nodes
-    node_list = list(nodes_dict.keys())
-    if len(node_list) < 2:
-        print(
+    # Select random start/end node pairs
+    if len(ids) < 2:
+        log.error(
             "Error: Not enough nodes with coordinates in the graph to test pathfinding."
         )
         sys.exit(1)
-    start_node = random.choice(node_list)
-    end_node = random.choice(node_list)
-    while start_node == end_node:  # Ensure start and end are different
-        end_node = random.choice(node_list)
-    print(f"\nSelected random nodes:\n  Start: {start_node}\n  End:   {end_node}")
-
-    # Run A* implementations
-    cpp_path, cpp_time = run_cpp_astar(
-        assignment2_cpp, cpp_road_network, start_node, end_node
-    )
-    nx_path, nx_time = run_nx_astar(G_nx, start_node, end_node, WEIGHT_ATTRIBUTE)
+    rng = np.random.default_rng(args.seed)
+    pairs = sample_node_pairs(ids, args.num_queries, rng)
+    warmup_pairs = sample_node_pairs(ids, args.warmup, rng) if args.warmup else []
+
+    # NetworkX runs on dense CSR row indices; map query endpoints there and back
+    node_ids = ids.tolist()
+    index_of = {node: i for i, node in enumerate(node_ids)}
+    index_pairs = [(index_of[s], index_of[t]) for s, t in pairs]
+
+    nx_results = None
+    nx_heuristic = None
+    G_simple = None
+    if args.reference:
+        # Run NetworkX on the same deduplicated topology the C++ module sees
+        G_simple = build_simple_nx_graph(indptr, indices, weights, WEIGHT_ATTRIBUTE)
+        if args.workers == 1:
+            nx_heuristic = build_nx_heuristic(lats, lons)
+
+    # Warm up before anything is timed, including the worker batch below
+    if warmup_pairs:
+        log.info(f"\nRunning {args.warmup} warm-up queries (not timed)...")
+        run_warmup(
+            getattr(assignment2_cpp.demo, CPP_SEARCH_FUNCTIONS[args.algo]),
+            cpp_road_network,
+            G_simple,
+            nx_heuristic,
+            warmup_pairs,
+            index_of,
+            WEIGHT_ATTRIBUTE,
+            args.cost_only,
+        )
+
+    # NetworkX A* is pure Python and GIL-bound, so with --workers the independent
+    # queries are farmed out to worker processes; otherwise the heuristic built
+    # above is reused by every query in the loop below
+    if args.reference and args.workers > 1:
+        log.info(
+            f"\nRunning {len(pairs)} NetworkX A* queries across {args.workers} worker processes..."
+        )
+        nx_results = run_nx_astar_batch(
+            index_pairs,
+            G_simple,
+            lats,
+            lons,
+            args.workers,
+            args.cost_only,
+            [(index_of[s], index_of[t]) for s, t in warmup_pairs],
+        )
 
-    # Compare results
-    compare_results(cpp_path, cpp_time, nx_path, nx_time, G_nx, WEIGHT_ATTRIBUTE)
+    total_cpp_time = 0.0
+    total_nx_time = 0.0 if args.reference else float("nan")
+    for i, (start_node, end_node) in enumerate(pairs, start=1):
+        log.info(
+            f"\nQuery {i}/{len(pairs)} - selected random nodes:"
+            f"\n  Start: {start_node}\n  End:   {end_node}"
+        )
+
+        # Run A* implementations
+        cpp_path, cpp_time = run_cpp_astar(
+            assignment2_cpp, cpp_road_network, start_node, end_node, args.algo
+        )
+        if nx_results is not None:
+            nx_path, nx_time = nx_results[i - 1]
+        elif args.reference:
+            nx_path, nx_time = run_nx_astar(
+                G_simple,
+                *index_pairs[i - 1],
+                WEIGHT_ATTRIBUTE,
+                nx_heuristic,
+                args.cost_only,
+            )
+        else:
+            log.info("\nSkipping NetworkX A* reference run (--no-reference).")
+            nx_path, nx_time = None, float("nan")
+        if nx_path is not None and not args.cost_only:
+            nx_path = [node_ids[k] for k in nx_path]
+
+        # Compare results
+        compare_results(
+            cpp_path,
+            cpp_time,
+            nx_path,
+            nx_time,
+            G_nx,
+            WEIGHT_ATTRIBUTE,
+            args.cost_only,
+        )
+        total_cpp_time += cpp_time
+        total_nx_time += nx_time
+
+    if len(pairs) > 1:
+        print(f"\n--- Totals over {len(pairs)} queries ---")
+        print(
+            f"C++ Time: {total_cpp_time:.4f} s (avg {total_cpp_time / len(pairs):.4f} s)"
+        )
+        if args.reference:
+            print(
+                f"NX Time:  {total_nx_time:.4f} s (avg {total_nx_time / len(pairs):.4f} s)"
+            )
+        else:
+            print("NX Time:  skipped (--no-reference)")
 
 
 if __name__ == "__main__":
@@ -1,12 +1,17 @@
+import argparse
 import sys
 import os
 import time
-import random
 import networkx as nx
+import numpy as np
 import osmnx as ox
-import collections
 import logging
 import csv
+from concurrent.futures import ProcessPoolExecutor
+from heapq import heappop, heappush
+from itertools import count
+
+from csr_cache import graph_to_csr, read_csr_arrays, save_csr_arrays
 
 # --- Configuration ---
 SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
@@ -16,6 +21,7 @@ GRAPHML_PATH = os.path.abspath(
     os.path.join(SCRIPT_DIR, "..", "osm_data", GRAPHML_FILENAME)
 )
 WEIGHT_ATTRIBUTE = "length"  # Edge attribute used for pathfinding weight
+EARTH_RADIUS_M = 6_371_009  # Same radius as osmnx.distance.great_circle
 # Default CMake preset name to look for the build artifacts
 DEFAULT_PRESET_NAME = "release"
 
@@ -23,6 +29,24 @@ SCRIPT_BASE = os.path.splitext(os.path.basename(__file__))[0]
 LOG_FILE = f"{SCRIPT_BASE}.log"
 CSV_FILE = f"{SCRIPT_BASE}.summary.csv"
 NUM_TESTS = 100  # Number of random start/end node pairs to test
+RANDOM_SEED = 42  # Seed for the start/end pair selection
+# Parallel C++ A* variants (functions in the 'demo' submodule) and their thread counts
+PARALLEL_SEARCH_FUNCTIONS = {
+    "TPool___CppLib": "AStarParallel_search_TPool_CppLib",
+    "TPool___PqFine": "AStarParallel_search_TPool_PqFine",
+    "TVector_CppLib": "AStarParallel_search_TVector_CppLib",
+    "TVector_PqFine": "AStarParallel_search_TVector_PqFine",
+}
+PARALLEL_THREAD_COUNTS = [2, 4, 6]
+# Summary CSV columns and how each value is formatted
+SUMMARY_FORMATS = {
+    "Variant": "{}",
+    "Threads": "{}",
+    "Avg Time (ms)": "{:.2f}",
+    "Avg Path Len": "{:.2f}",
+    "Avg Cost": "{:.2f}",
+    "Match (%)": "{:.1f}",
+}
 
 # --- Helper: Add Build Directory to Path ---
 def add_custom_module_path(preset_name=DEFAULT_PRESET_NAME):
@@ -73,229 +97,351 @@ def load_graph_from_graphml(graphml_path):
 
 # --- Helper: Prepare Data for C++ Module ---
 def prepare_cpp_data(G_nx, weight_attribute):
-    """Converts NetworkX graph data to dictionaries suitable for the C++ module."""
+    """Converts NetworkX graph data to CSR arrays for RoadNetwork.from_csr.
+
+    Returns (indptr, indices, weights, lats, lons, ids) as built by
+    csr_cache.graph_to_csr, which documents the layout.
+    """
     print("Preparing data for C++ module...")
     start_time = time.time()
-    nodes_dict = {}
-    graph_dict = {}
-    missing_coords = 0
-    missing_weights = 0
-
-    # Extract node coordinates
-    for node, data in G_nx.nodes(data=True):
-        if "y" in data and "x" in data:
-            nodes_dict[node] = (data["y"], data["x"])  # (lat, lon)
-        else:
-            missing_coords += 1
-
-    if missing_coords > 0:
-        print(f"Warning: {missing_coords} nodes missing coordinate data ('x' or 'y').")
-
-    # Extract edges and weights, handling parallel edges by keeping the lowest weight
-    for u, v, data in G_nx.edges(data=True):
-        weight = data.get(weight_attribute)
-        if weight is None:
-            missing_weights += 1
-            continue
-
-        if u not in graph_dict:
-            graph_dict[u] = []
-
-        # Check if edge (u, v) already exists; update if new weight is lower
-        found = False
-        for i, (target, existing_weight) in enumerate(graph_dict[u]):
-            if target == v:
-                if weight < existing_weight:
-                    graph_dict[u][i] = (v, weight)
-                found = True
-                break
-        if not found:
-            graph_dict[u].append((v, weight))
-
-    if missing_weights > 0:
-        print(f"Warning: Skipped {missing_weights} edges missing weight attribute '{weight_attribute}'.")
-
-    # Ensure all nodes from nodes_dict exist as keys in graph_dict (even if no outgoing edges)
-    for node_id in nodes_dict:
-        if node_id not in graph_dict:
-            graph_dict[node_id] = []
 
-    print(f"Data preparation finished in {time.time() - start_time:.2f} seconds.")
-    return nodes_dict, graph_dict
+    arrays = graph_to_csr(G_nx, weight_attribute)
 
+    print(f"Data preparation finished in {time.time() - start_time:.2f} seconds.")
+    return arrays
+
+
+# --- Helper: Load Prepared CSR Arrays (cached) ---
+def load_csr_arrays(graphml_path, weight_attribute):
+    """Returns the CSR arrays for the GraphML file, reusing an .npz cache when possible.
+
+    The arrays are saved next to the GraphML file after the first parse and loaded
+    directly on later runs, skipping both GraphML parsing and data preparation, as
+    long as the cache is newer than the GraphML file and was built with the same
+    weight_attribute.
+    """
+    cache_path = graphml_path + ".npz"
+    if os.path.exists(cache_path) and (
+        not os.path.exists(graphml_path)
+        or os.path.getmtime(cache_path) >= os.path.getmtime(graphml_path)
+    ):
+        start_time = time.time()
+        try:
+            arrays = read_csr_arrays(cache_path, weight_attribute)
+            if arrays is not None:
+                print(
+                    f"Prepared network loaded from cache '{cache_path}' in {time.time() - start_time:.2f} seconds."
+                )
+                return arrays
+            print(
+                f"Cached network '{cache_path}' was not built with weight "
+                f"'{weight_attribute}'; rebuilding it."
+            )
+        except Exception as e:
+            print(f"Warning: Could not load cached network '{cache_path}': {e}")
 
-# --- Helper: Run C++ Sequential A* Search ---
-def run_cpp_sequential_astar(cpp_module, cpp_network, start_node, end_node):
-    """Runs the C++ A* implementation and returns the path and execution time."""
-    log_lines = []
-    log_lines.append("")
-    log_lines.append(f"Running C++ Sequential A* implementation...")
-    start_time = time.time()
-    cpp_path = None
+    G_nx = load_graph_from_graphml(graphml_path)
+    arrays = prepare_cpp_data(G_nx, weight_attribute)
     try:
-        # Access the function within the 'demo' submodule
-        cpp_path = cpp_module.demo.AStar_search(cpp_network, start_node, end_node)
-        cpp_time = time.time() - start_time
-        if not cpp_path:  # C++ returns empty list [] if no path
-            log_lines.append(f"C++ A*: No path found in {cpp_time:.4f} seconds.")
-        else:
-            log_lines.append(f"C++ A* found path (length {len(cpp_path)}) in {cpp_time:.4f} seconds.")
+        save_csr_arrays(cache_path, arrays, weight_attribute)
+        print(f"Cached prepared network to '{cache_path}'.")
+    except OSError as e:
+        print(f"Warning: Could not write network cache '{cache_path}': {e}")
+    return arrays
+
+
+# --- Helper: Build NetworkX Graph from CSR Arrays ---
+def build_nx_graph(indptr, indices, weights, ids, weight_attribute):
+    """Builds the deduplicated DiGraph (OSM node IDs) matching the C++ network."""
+    sources = np.repeat(ids, np.diff(indptr))
+    G = nx.DiGraph()
+    G.add_nodes_from(ids.tolist())
+    G.add_weighted_edges_from(
+        zip(sources.tolist(), ids[indices].tolist(), weights.tolist()),
+        weight=weight_attribute,
+    )
+    return G
+
+
+# --- Helper: Sample Random Start/End Pairs ---
+def sample_node_pairs(node_ids, num_pairs, rng):
+    """Draws num_pairs (start, end) node pairs with start != end in one vectorized pass."""
+    picks = rng.integers(0, len(node_ids), size=(num_pairs, 2))
+    same = picks[:, 0] == picks[:, 1]
+    while same.any():  # Resample only the colliding end nodes
+        picks[same, 1] = rng.integers(0, len(node_ids), size=int(same.sum()))
+        same = picks[:, 0] == picks[:, 1]
+    return [tuple(pair) for pair in node_ids[picks].tolist()]
+
+
+# --- Helper: Run C++ A* Search ---
+def run_cpp_astar(search_func, cpp_network, start_node, end_node, extra_args, description):
+    """Runs one resolved C++ A* function and returns the path and execution time.
+
+    extra_args are appended after (network, start, end), e.g. the thread count of
+    the parallel variants; description names the variant in the log.
+    """
+    logging.info("")
+    logging.info("Running C++ %s...", description)
+    # Only the search call itself is timed; all logging happens outside the window
+    try:
+        start_time = time.perf_counter()
+        cpp_path = search_func(cpp_network, start_node, end_node, *extra_args)
+        cpp_time = time.perf_counter() - start_time
     except Exception as e:
-        log_lines.append(f"Error running C++ A*: {e}")
-        cpp_time = float("inf")  # Indicate failure
-        cpp_path = None  # Ensure path is None on error
-        
-    # Print and log
-    for line in log_lines:
-        # print(line)
-        logging.info(line)
-        
+        logging.info("Error running C++ A*: %s", e)
+        return None, float("inf")  # Indicate failure
+
+    if not cpp_path:  # C++ returns empty list [] if no path
+        logging.info("C++ A*: No path found in %.4f seconds.", cpp_time)
+    else:
+        logging.info(
+            "C++ A* found path (length %d) in %.4f seconds.", len(cpp_path), cpp_time
+        )
     return cpp_path, cpp_time
 
 
-# --- Helper: Run C++ Parallel A* Search ---
-def run_cpp_parallel_astar(cpp_module, cpp_network, start_node, end_node, number_of_threads, parallel_type):
-    """Runs the C++ A* implementation and returns the path and execution time."""
-    log_lines = []
-    log_lines.append("")
-    log_lines.append(f"Running C++ Parallel A* implementation with {parallel_type} type and {number_of_threads} threads...")
-    start_time = time.time()
-    cpp_path = None
-    try:
-        # Access the function within the 'demo' submodule        
-        parallel_dispatch = {
-            "TPool___CppLib"  : cpp_module.demo.AStarParallel_search_TPool_CppLib,
-            "TVector_CppLib": cpp_module.demo.AStarParallel_search_TVector_CppLib,
-            "TPool___PqFine"  : cpp_module.demo.AStarParallel_search_TPool_PqFine,
-            "TVector_PqFine": cpp_module.demo.AStarParallel_search_TVector_PqFine,
-        }
+# --- Helper: Define Heuristic for NetworkX ---
+def build_nx_heuristic(ids, lats, lons):
+    """Builds a factory returning the Haversine heuristic toward a given goal node.
+
+    The goal is fixed for a whole query, so the distance from every node to it is
+    computed in one vectorized NumPy pass; the heuristic itself is then a list lookup.
+    """
+    idx = {node: i for i, node in enumerate(ids.tolist())}
+    lat = np.radians(lats)
+    lon = np.radians(lons)
+
+    def heuristic_to(goal):
+        g = idx[goal]
+        a = (
+            np.sin((lat - lat[g]) * 0.5) ** 2
+            + np.cos(lat[g]) * np.cos(lat) * np.sin((lon - lon[g]) * 0.5) ** 2
+        )
+        h_goal = (EARTH_RADIUS_M * 2.0 * np.arcsin(np.sqrt(a))).tolist()
 
-        search_func = parallel_dispatch[parallel_type]
-        cpp_path = search_func(cpp_network, start_node, end_node, number_of_threads)
-        cpp_time = time.time() - start_time
-        if not cpp_path:  # C++ returns empty list [] if no path
-            log_lines.append(f"C++ A*: No path found in {cpp_time:.4f} seconds.")
-        else:
-            log_lines.append(f"C++ A* found path (length {len(cpp_path)}) in {cpp_time:.4f} seconds.")
+        def nx_heuristic(u, v):
+            try:
+                return h_goal[idx[u]]
+            except KeyError as e:
+                print(f"Error: Node {e} missing coordinate data ('x' or 'y') for heuristic.")
+                return float("inf")  # Return infinity if data is missing
+
+        return nx_heuristic
+
+    return heuristic_to
+
+
+# --- Helper: NetworkX A* with Inlined Edge Weights ---
+def fast_astar_path(G, source, target, heuristic, weight):
+    """networkx.astar_path with the edge-weight lookup inlined.
+
+    Same search as networkx.algorithms.shortest_paths.astar.astar_path, reading
+    neighbors straight from G._adj and the weight directly from the edge data instead
+    of calling the per-edge weight function. G is the simple DiGraph from
+    build_nx_graph (parallel edges already reduced to their lowest weight); edges
+    without the weight attribute are skipped, matching the data handed to the C++
+    module.
+    """
+    if source not in G:
+        raise nx.NodeNotFound(f"Source {source} is not in G")
+    if target not in G:
+        raise nx.NodeNotFound(f"Target {target} is not in G")
+
+    G_succ = G._adj
+    inf = float("inf")
+
+    # Queue entries: (priority, tie-breaker, node, cost to reach, parent)
+    c = count()
+    queue = [(0, next(c), source, 0, None)]
+    enqueued = {}  # node -> (cost of best queued path, heuristic to target)
+    explored = {}  # node -> parent on the best path from source
+
+    while queue:
+        _, __, curnode, dist, parent = heappop(queue)
+
+        if curnode == target:
+            path = [curnode]
+            node = parent
+            while node is not None:
+                path.append(node)
+                node = explored[node]
+            path.reverse()
+            return path
+
+        if curnode in explored:
+            # Do not override the parent of starting node
+            if explored[curnode] is None:
+                continue
+            # Skip bad paths that were enqueued before finding a better one
+            qcost, h = enqueued[curnode]
+            if qcost < dist:
+                continue
 
-    except KeyError:
-        raise ValueError(f"Unsupported parallel type: {parallel_type}")
-            
-    except Exception as e:
-        log_lines.append(f"Error running C++ A*: {e}")
-        cpp_time = float("inf")  # Indicate failure
-        cpp_path = None  # Ensure path is None on error
-    
-    # Print and log
-    for line in log_lines:
-        # print(line)
-        logging.info(line)
-        
-    return cpp_path, cpp_time
+        explored[curnode] = parent
+
+        for neighbor, data in G_succ[curnode].items():
+            cost = data.get(weight, inf)
+            if cost == inf:
+                continue
+            ncost = dist + cost
+            if neighbor in enqueued:
+                # Reuse the stored heuristic: it is evaluated at most once per node
+                # and query, so memoizing the heuristic itself would never hit
+                qcost, h = enqueued[neighbor]
+                if qcost <= ncost:
+                    continue
+            else:
+                h = heuristic(neighbor, target)
 
+            enqueued[neighbor] = ncost, h
+            heappush(queue, (ncost + h, next(c), neighbor, ncost, curnode))
 
-# --- Helper: Define Heuristic for NetworkX ---
-def nx_heuristic(u, v, G_nx):
-    """Heuristic function (Haversine distance) for networkx.astar_path."""
-    try:
-        u_coords = G_nx.nodes[u]
-        v_coords = G_nx.nodes[v]
-        # Use osmnx great_circle which expects (lat, lon)
-        return ox.distance.great_circle(
-            u_coords["y"], u_coords["x"], v_coords["y"], v_coords["x"]
-        )
-    except KeyError as e:
-        print(f"Error: Node {e} missing coordinate data ('x' or 'y') for heuristic.")
-        return float("inf")  # Return infinity if data is missing
+    raise nx.NetworkXNoPath(f"Node {target} not reachable from {source}")
 
 
 # --- Helper: Run NetworkX A* Search ---
-def run_nx_astar(G_nx, start_node, end_node, weight_attribute):
-    """Runs the NetworkX A* implementation and returns the path and execution time."""
-    log_lines = []
-    log_lines.append("")
-    log_lines.append("Running NetworkX A* implementation...")
-    start_time = time.time()
+def run_nx_astar(G_nx, start_node, end_node, weight_attribute, heuristic_to):
+    """Runs the NetworkX A* implementation and returns the path and execution time.
+
+    heuristic_to(goal) builds the query's heuristic; that setup is part of the timing.
+    """
+    logging.info("")
+    logging.info("Running NetworkX A* implementation...")
+    start_time = time.perf_counter()
     nx_path = None
     try:
-        # Pass the heuristic function correctly, using a lambda to include G_nx
-        nx_path = nx.astar_path(
+        nx_path = fast_astar_path(
             G_nx,
             start_node,
             end_node,
             weight=weight_attribute,
-            heuristic=lambda u, v: nx_heuristic(u, v, G_nx),  # Pass G_nx context
+            heuristic=heuristic_to(end_node),
+        )
+        nx_time = time.perf_counter() - start_time
+        logging.info(
+            "NetworkX A* found path (length %d) in %.4f seconds.", len(nx_path), nx_time
         )
-        nx_time = time.time() - start_time
-        log_lines.append(f"NetworkX A* found path (length {len(nx_path)}) in {nx_time:.4f} seconds.")
     except nx.NetworkXNoPath:
-        nx_time = time.time() - start_time
-        log_lines.append(f"NetworkX A*: No path found in {nx_time:.4f} seconds.")
+        nx_time = time.perf_counter() - start_time
+        logging.info("NetworkX A*: No path found in %.4f seconds.", nx_time)
         nx_path = None  # Ensure path is None
     except Exception as e:
-        log_lines.append(f"Error running NetworkX A*: {e}")
+        logging.info("Error running NetworkX A*: %s", e)
         nx_time = float("inf")  # Indicate failure
         nx_path = None  # Ensure path is None on error
-    
-    # Print and log
-    for line in log_lines:
-        # print(line)
-        logging.info(line)
-        
+
     return nx_path, nx_time
 
 
+# --- Helper: Run NetworkX A* Queries in Worker Processes ---
+_worker_graph = None
+_worker_heuristic = None
+
+
+def _init_nx_worker(G_nx, ids, lats, lons):
+    """Stores the graph and builds the heuristic once per worker process."""
+    global _worker_graph, _worker_heuristic
+    _worker_graph = G_nx
+    _worker_heuristic = build_nx_heuristic(ids, lats, lons)
+
+
+def _nx_one(pair):
+    """Runs a single NetworkX A* query against the worker's graph."""
+    start_node, end_node = pair
+    return run_nx_astar(
+        _worker_graph, start_node, end_node, WEIGHT_ATTRIBUTE, _worker_heuristic
+    )
+
+
+def run_nx_astar_batch(pairs, G_nx, ids, lats, lons, num_workers):
+    """Runs NetworkX A* for every (start, end) pair across a pool of processes."""
+    with ProcessPoolExecutor(
+        max_workers=num_workers,
+        initializer=_init_nx_worker,
+        initargs=(G_nx, ids, lats, lons),
+    ) as executor:
+        return list(executor.map(_nx_one, pairs))
+
+
+# --- Helper: Summarize One Search Result ---
+def _summarize_path(path, elapsed, G_nx, weight_attribute, path_cost_cache=None):
+    """Returns the time (ms), path length, path cost and found flag of one search.
+
+    path_cost_cache maps path tuples to costs, so variants returning the same path
+    for a query share one nx.path_weight computation.
+    """
+    found = bool(path)
+    cost = None
+    if found:
+        key = tuple(path)
+        if path_cost_cache is not None:
+            cost = path_cost_cache.get(key)
+        if cost is None:
+            try:
+                cost = nx.path_weight(G_nx, path, weight=weight_attribute)
+                if path_cost_cache is not None:
+                    path_cost_cache[key] = cost
+            except Exception as e:
+                logging.info("Could not calculate path cost: %s", e)
+    return {
+        "time_ms": elapsed * 1000,
+        "path_len": len(path) if found else 0,
+        "cost": cost,
+        "found": found,
+    }
+
+
 # --- Helper: Compare Results ---
-def compare_results(cpp_path, cpp_time, nx_path, nx_time, G_nx, weight_attribute):
+def compare_results(
+    cpp_path, cpp_time, nx_path, nx_time, G_nx, weight_attribute, path_cost_cache=None
+):
     """Compares the paths and timings from both implementations and returns summary info."""
-    log_lines = []
-    log_lines.append("")
-    log_lines.append("--- Comparison ---")
-    log_lines.append(f"C++ Time: {cpp_time:.4f} s")
-    log_lines.append(f"NX Time:  {nx_time:.4f} s")
+    cpp_summary = _summarize_path(
+        cpp_path, cpp_time, G_nx, weight_attribute, path_cost_cache
+    )
+    logging.info("")
+    logging.info("--- Comparison ---")
+    logging.info("C++ Time: %.4f s", cpp_time)
+    logging.info("NX Time:  %.4f s", nx_time)
 
     path_match = False
-    cpp_path_found = bool(cpp_path)
+    cpp_path_found = cpp_summary["found"]
     nx_path_found = nx_path is not None
-    path_cost = None
+    path_cost = cpp_summary["cost"]
 
     # Check if both found a path (cpp_path is non-empty list, nx_path is not None)
     if cpp_path_found and nx_path_found:
         if cpp_path == nx_path:
-            log_lines.append("Paths are identical.")
+            logging.info("Paths are identical.")
             path_match = True
         else:
-            log_lines.append("Paths DIFFER:")
-            log_lines.append(f"  C++ Path Length: {len(cpp_path)}")
-            log_lines.append(f"  NX Path Length:  {len(nx_path)}")
+            logging.info("Paths DIFFER:")
+            logging.info("  C++ Path Length: %d", len(cpp_path))
+            logging.info("  NX Path Length:  %d", len(nx_path))
     elif not cpp_path_found and not nx_path_found:
-        log_lines.append("Neither implementation found a path.")
+        logging.info("Neither implementation found a path.")
         path_match = True  # This is also considered a match in terms of result
     else:
-        log_lines.append("Paths DIFFER: One implementation found a path, the other did not.")
-        log_lines.append(
-            f"  C++ Path found: {'Yes' if cpp_path_found else 'No'} (Length: {len(cpp_path) if cpp_path_found else 'N/A'})"
+        logging.info("Paths DIFFER: One implementation found a path, the other did not.")
+        logging.info(
+            "  C++ Path found: %s (Length: %s)",
+            "Yes" if cpp_path_found else "No",
+            len(cpp_path) if cpp_path_found else "N/A",
         )
-        log_lines.append(
-            f"  NX Path found:  {'Yes' if nx_path_found else 'No'} (Length: {len(nx_path) if nx_path_found else 'N/A'})"
+        logging.info(
+            "  NX Path found:  %s (Length: %s)",
+            "Yes" if nx_path_found else "No",
+            len(nx_path) if nx_path_found else "N/A",
         )
 
-    if cpp_path_found:
-        try:
-            path_cost = nx.path_weight(G_nx, cpp_path, weight=weight_attribute)
-            log_lines.append(f"Path cost (using '{weight_attribute}'): {path_cost:.2f}")
-        except Exception as e:
-            log_lines.append(f"Could not calculate path cost: {e}")
-
-    # Print and log
-    for line in log_lines:
-        # print(line)
-        logging.info(line)
+    if path_cost is not None:
+        logging.info("Path cost (using '%s'): %.2f", weight_attribute, path_cost)
 
     return {
-        "cpp_time_ms": cpp_time * 1000,
+        "cpp_time_ms": cpp_summary["time_ms"],
         "nx_time_ms": nx_time * 1000,
-        "cpp_path_len": len(cpp_path) if cpp_path else 0,
+        "cpp_path_len": cpp_summary["path_len"],
         "nx_path_len": len(nx_path) if nx_path else 0,
         "cost": path_cost,
         "match": path_match,
@@ -305,6 +451,22 @@ def compare_results(cpp_path, cpp_time, nx_path, nx_time, G_nx, weight_attribute
 
 # --- Main Execution Block ---
 def main():
+    parser = argparse.ArgumentParser(
+        description="Compare the C++ A* variants against NetworkX A* on random queries."
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help=(
+            "Number of worker processes for the NetworkX A* reference runs. Parallel "
+            "workers share cores and memory bandwidth, which inflates per-query times."
+        ),
+    )
+    args = parser.parse_args()
+    if args.workers < 1:
+        parser.error("--workers must be at least 1")
+
     # Setup logging once (at top-level or main)
     logging.basicConfig(
         filename=LOG_FILE,
@@ -323,112 +485,164 @@ def main():
         print("Make sure the module is built and the path is correct.")
         sys.exit(1)
 
-    # Load graph data
-    G_nx = load_graph_from_graphml(GRAPHML_PATH)
-
-    # Prepare data structures for C++
-    nodes_dict, graph_dict = prepare_cpp_data(G_nx, WEIGHT_ATTRIBUTE)
+    # Load the prepared graph data (parsing the GraphML file only on a cache miss)
+    indptr, indices, weights, lats, lons, node_ids = load_csr_arrays(
+        GRAPHML_PATH, WEIGHT_ATTRIBUTE
+    )
 
     # Create C++ RoadNetwork object
     try:
-        cpp_road_network = assignment2_cpp.RoadNetwork(graph_dict, nodes_dict)
+        cpp_road_network = assignment2_cpp.RoadNetwork.from_csr(
+            indptr, indices, weights, lats, lons, node_ids
+        )
         print("C++ RoadNetwork object created successfully.")
     except Exception as e:
         print(f"Error creating C++ RoadNetwork object: {e}")
         sys.exit(1)
 
+    # NetworkX runs on the same deduplicated topology the C++ module sees
+    G_nx = build_nx_graph(indptr, indices, weights, node_ids, WEIGHT_ATTRIBUTE)
+
     # Validate enough nodes
-    node_list = list(nodes_dict.keys())
-    if len(node_list) < 2:
+    if len(node_ids) < 2:
         print("Error: Not enough nodes with coordinates in the graph to test pathfinding.")
         sys.exit(1)
 
-    # Prepare summary storage
-    results_summary = collections.defaultdict(lambda: {
-        "total_time_ms": 0.0, "runs": 0, "total_cost": 0.0,
-        "total_path_len": 0, "match_count": 0, "num_threads": ""
-    })
+    # Draw every (start, end) pair up front from a seeded generator (reproducible runs)
+    pairs = sample_node_pairs(node_ids, NUM_TESTS, np.random.default_rng(RANDOM_SEED))
 
-    # Define test variants
+    # NetworkX A* is pure Python and GIL-bound, so with --workers the independent
+    # baseline queries are answered up front across worker processes; the test loop
+    # consumes the results
+    if args.workers > 1:
+        print(
+            f"\nRunning {len(pairs)} NetworkX A* queries across {args.workers} worker processes..."
+        )
+        batch_start = time.perf_counter()
+        nx_results = run_nx_astar_batch(pairs, G_nx, node_ids, lats, lons, args.workers)
+        batch_wall_time = time.perf_counter() - batch_start
+        # Per-query times were measured while the workers competed for cores, so they
+        # are not comparable to a serial run; report them apart from the wall time
+        query_time_sum = sum(t for _, t in nx_results if np.isfinite(t))
+        print(
+            f"NetworkX A* batch: {batch_wall_time:.2f} s wall time, "
+            f"{query_time_sum:.2f} s summed over queries."
+        )
+    else:
+        # Build the NetworkX heuristic factory once, before any timed query
+        nx_heuristic = build_nx_heuristic(node_ids, lats, lons)
+        nx_results = [
+            run_nx_astar(G_nx, start_node, end_node, WEIGHT_ATTRIBUTE, nx_heuristic)
+            for start_node, end_node in pairs
+        ]
+
+    # Define test variants, resolving each C++ function once up front
     test_variants = {
-        "Sequential": {"fn": lambda *args: run_cpp_sequential_astar(assignment2_cpp, *args), "threads": ""},
+        "Sequential": {
+            "fn": assignment2_cpp.demo.AStar_search,
+            "threads": "",
+            "args_tail": (),
+            "description": "Sequential A* implementation",
+        },
     }
-    for num_threads in [2, 4, 6]:
-        for variant in ["TPool___CppLib", "TPool___PqFine", "TVector_CppLib", "TVector_PqFine"]:
-            name = f"{variant}_{num_threads}thr"
-            test_variants[name] = {
-                "fn": lambda net, s, e, nt=num_threads, v=variant: run_cpp_parallel_astar(
-                    assignment2_cpp, net, s, e, nt, v
+    for num_threads in PARALLEL_THREAD_COUNTS:
+        for variant, func_name in PARALLEL_SEARCH_FUNCTIONS.items():
+            test_variants[f"{variant}_{num_threads}thr"] = {
+                "fn": getattr(assignment2_cpp.demo, func_name),
+                "threads": num_threads,
+                "args_tail": (num_threads,),
+                "description": (
+                    f"Parallel A* implementation with {variant} type and {num_threads} threads"
                 ),
-                "threads": num_threads
             }
 
+    # Prepare summary storage: one row per variant ("NX" first), one column per test;
+    # NaN marks runs that did not complete
+    variant_names = ["NX"] + list(test_variants)
+    variant_threads = [""] + [meta["threads"] for meta in test_variants.values()]
+    times_ms = np.full((len(variant_names), len(pairs)), np.nan)
+    path_lens = np.full_like(times_ms, np.nan)
+    costs = np.full_like(times_ms, np.nan)
+    matches = np.full_like(times_ms, np.nan)
+
     # Log file for compare_results output
-    for i in range(NUM_TESTS):
-        start_node, end_node = random.sample(node_list, 2)
+    for i, (start_node, end_node) in enumerate(pairs):
         print(f"\nTest {i}: start_node is {start_node}, end_node is {end_node}")
+        nx_path, nx_time = nx_results[i]
+        path_cost_cache = {}  # Per query, so it only ever holds this pair's paths
 
-        try:
-            nx_path, nx_time = run_nx_astar(G_nx, start_node, end_node, WEIGHT_ATTRIBUTE)
-        except Exception as e:
-            print(f"Error in NX run {i+1}: {e}")
-            continue
-
-        result = compare_results(nx_path, nx_time, nx_path, nx_time, G_nx, WEIGHT_ATTRIBUTE)
-        summary = results_summary["NX"]
-        summary["total_time_ms"] += result["cpp_time_ms"]
-        summary["total_path_len"] += result["cpp_path_len"] if result["cpp_path_len"] is not None else 0
-        summary["total_cost"] += result["cost"] if result["cost"] is not None else 0
-        summary["match_count"] += int(result["match"])
-        summary["runs"] += 1
-        summary["num_threads"] = ""
-
-        for name, meta in test_variants.items():
+        # The reference needs no comparison against itself, only its own figures
+        nx_summary = _summarize_path(
+            nx_path, nx_time, G_nx, WEIGHT_ATTRIBUTE, path_cost_cache
+        )
+        times_ms[0, i] = nx_summary["time_ms"]
+        path_lens[0, i] = nx_summary["path_len"]
+        costs[0, i] = nx_summary["cost"] if nx_summary["cost"] is not None else 0
+        matches[0, i] = 1  # The reference always matches itself
+
+        for vi, (name, meta) in enumerate(test_variants.items(), start=1):
             try:
-                cpp_path, cpp_time = meta["fn"](cpp_road_network, start_node, end_node)
-                result = compare_results(cpp_path, cpp_time, nx_path, nx_time, G_nx, WEIGHT_ATTRIBUTE)
+                cpp_path, cpp_time = run_cpp_astar(
+                    meta["fn"],
+                    cpp_road_network,
+                    start_node,
+                    end_node,
+                    meta["args_tail"],
+                    meta["description"],
+                )
+                result = compare_results(
+                    cpp_path,
+                    cpp_time,
+                    nx_path,
+                    nx_time,
+                    G_nx,
+                    WEIGHT_ATTRIBUTE,
+                    path_cost_cache,
+                )
             except Exception as e:
                 print(f"Error in {name} run {i+1}: {e}")
                 continue
 
-            summary = results_summary[name]
-            summary["total_time_ms"] += result["cpp_time_ms"]
-            summary["total_path_len"] += result["cpp_path_len"] if result["cpp_path_len"] is not None else 0
-            summary["total_cost"] += result["cost"] if result["cost"] is not None else 0
-            summary["match_count"] += int(result["match"])
-            summary["runs"] += 1
-            summary["num_threads"] = meta["threads"]
+            times_ms[vi, i] = result["cpp_time_ms"]
+            path_lens[vi, i] = result["cpp_path_len"]
+            costs[vi, i] = result["cost"] if result["cost"] is not None else 0
+            matches[vi, i] = result["match"]
+
+    # Average every variant once over its completed runs; the console table and the
+    # CSV share these rows
+    runs = np.count_nonzero(~np.isnan(times_ms), axis=1)
+    total_time_ms, total_path_len, total_cost, match_count = (
+        np.nansum(column, axis=1) for column in (times_ms, path_lens, costs, matches)
+    )
+    rows = [
+        {
+            "Variant": variant_names[vi],
+            "Threads": variant_threads[vi],
+            "Avg Time (ms)": total_time_ms[vi] / runs[vi],
+            "Avg Path Len": total_path_len[vi] / runs[vi],
+            "Avg Cost": total_cost[vi] / runs[vi],
+            "Match (%)": 100.0 * match_count[vi] / runs[vi],
+        }
+        for vi in np.flatnonzero(runs)
+    ]
 
     # Print summary
     print(f"\n=== Summary of All Runs (averaged over {NUM_TESTS} pairs) ===")
     print(f"{'Variant':<25} {'Threads':>8} {'Avg Time':>10} {'Avg Len':>10} {'Avg Cost':>10} {'Match %':>12}")
     print("-" * 85)
-    for name, s in results_summary.items():
-        if s["runs"] == 0:
-            continue
-        avg_time = s["total_time_ms"] / s["runs"]
-        avg_len = s["total_path_len"] / s["runs"]
-        avg_cost = s["total_cost"] / s["runs"]
-        match_pct = 100.0 * s["match_count"] / s["runs"]
-        print(f"{name:<25} {str(s['num_threads']):>8} {avg_time:10.2f} "
-              f"{avg_len:10.2f} {avg_cost:10.2f} {match_pct:12.1f}")
+    for row in rows:
+        print(f"{row['Variant']:<25} {str(row['Threads']):>8} {row['Avg Time (ms)']:10.2f} "
+              f"{row['Avg Path Len']:10.2f} {row['Avg Cost']:10.2f} {row['Match (%)']:12.1f}")
 
     # Write CSV summary
     csv_filename = CSV_FILE
     with open(csv_filename, mode="w", newline="") as csvfile:
-        writer = csv.writer(csvfile)
-        writer.writerow(["Variant", "Threads", "Avg Time (ms)", "Avg Path Len", "Avg Cost", "Match (%)"])
-        for name, s in results_summary.items():
-            if s["runs"] == 0:
-                continue
-            avg_time = s["total_time_ms"] / s["runs"]
-            avg_len = s["total_path_len"] / s["runs"]
-            avg_cost = s["total_cost"] / s["runs"]
-            match_pct = 100.0 * s["match_count"] / s["runs"]
-            writer.writerow([
-                name, s["num_threads"], f"{avg_time:.2f}", f"{avg_len:.2f}",
-                f"{avg_cost:.2f}", f"{match_pct:.1f}"
-            ])
+        writer = csv.DictWriter(csvfile, fieldnames=list(SUMMARY_FORMATS))
+        writer.writeheader()
+        writer.writerows(
+            {key: fmt.format(row[key]) for key, fmt in SUMMARY_FORMATS.items()}
+            for row in rows
+        )
     print(f"\nCSV summary written to '{csv_filename}'")
 
 
@@ -2,6 +2,7 @@ import gdown
 import os
 import sys
 import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
 
 # --- Configuration ---
 # Define download details for each location
@@ -41,6 +42,9 @@ def download_from_gdrive(url, expected_filename):
 
     try:
         print(f"[{thread_name}] Attempting download via gdown...")
+        # gdown streams the response to a temp file in 512 KiB writes and moves it into
+        # place at the end: ~1000 write() calls for the ~500 MB London file, which is
+        # negligible next to the transfer itself
         downloaded_path = gdown.download(
             url=url, output=None, quiet=True, fuzzy=True
         )  # quiet=True for less cluttered parallel output
@@ -119,40 +123,44 @@ if not selected_keys:
 else:
     print(f"\nSelected: {', '.join(selected_keys)}")
 
-    threads = []
+    futures = {}
     skipped_placeholders = False
+    attempted_count = 0
     final_success_count = 0
 
     if len(selected_keys) > 1:
         print("Starting parallel downloads...")
-        for key in selected_keys:
-            if key in drive_files:
-                config = drive_files[key]
-                # Check for placeholder URL *before* creating thread
-                if "YOUR_" in config["url"]:
-                    print(
-                        f"\nSkipping {config['output_filename']}: Please replace the placeholder URL in the script."
+        # One pool for all downloads; gdown blocks on network I/O (releasing the GIL),
+        # so the transfers overlap while the futures carry back each result
+        with ThreadPoolExecutor(
+            max_workers=len(selected_keys), thread_name_prefix="Download"
+        ) as executor:
+            for key in selected_keys:
+                if key in drive_files:
+                    config = drive_files[key]
+                    # Check for placeholder URL *before* submitting the download
+                    if "YOUR_" in config["url"]:
+                        print(
+                            f"\nSkipping {config['output_filename']}: Please replace the placeholder URL in the script."
+                        )
+                        skipped_placeholders = True
+                        continue  # Skip this file
+
+                    future = executor.submit(
+                        download_from_gdrive, config["url"], config["output_filename"]
                     )
-                    skipped_placeholders = True
-                    continue  # Skip this file
-
-                # Create and start a thread for each download
-                thread = threading.Thread(
-                    target=download_from_gdrive,
-                    args=(config["url"], config["output_filename"]),
-                    name=f"Thread-{key}",  # Give threads meaningful names
-                )
-                threads.append(thread)
-                thread.start()
-            else:
-                print(f"Warning: Configuration for '{key}' not found. Skipping.")
-
-        # Wait for all started threads to complete
-        print("\nWaiting for downloads to finish...")
-        for thread in threads:
-            thread.join()  # This blocks until the thread finishes
-        # Note: We aren't explicitly checking return values here for simplicity,
-        # rely on printed messages from the function. Could be enhanced.
+                    futures[future] = config["output_filename"]
+                    attempted_count += 1
+                else:
+                    print(f"Warning: Configuration for '{key}' not found. Skipping.")
+
+            # Report each download as soon as it finishes
+            print("\nWaiting for downloads to finish...")
+            for future in as_completed(futures):
+                if future.result():
+                    final_success_count += 1
+                else:
+                    print(f"Download failed: {futures[future]}", file=sys.stderr)
 
     elif len(selected_keys) == 1:
         # Run sequentially if only one is selected
@@ -167,11 +175,14 @@ else:
                 skipped_placeholders = True
             else:
                 # Directly call the function
-                download_from_gdrive(config["url"], config["output_filename"])
+                attempted_count += 1
+                if download_from_gdrive(config["url"], config["output_filename"]):
+                    final_success_count += 1
         else:
             print(f"Warning: Configuration for '{key}' not found. Skipping.")
 
     print("\n----------------------------------------")
     print("Overall download process finished.")
+    print(f"Downloaded {final_success_count} of {attempted_count} file(s).")
     if skipped_placeholders:
         print("Note: One or more downloads were skipped due to placeholder URLs.")
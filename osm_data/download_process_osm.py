@@ -1,48 +1,151 @@
+import argparse
 import osmnx as ox
 import networkx as nx
+import os
+import pickle
 import sys
+import tempfile
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+# The CSR cache format is owned by the A* scripts; reuse their writer so the files
+# stay loadable by cpp_integration/testAStar.py. csr_cache is installed with the
+# project (pip install -e . / uv sync); without it the .npz cache is not written.
+try:
+    from csr_cache import graph_to_csr, save_csr_arrays
+except ImportError:
+    graph_to_csr = save_csr_arrays = None
 
 print(f"OSMnx version: {ox.__version__}")
 print(f"NetworkX version: {nx.__version__}")
 
+# OSMnx caches Overpass responses by default; keep them in a dedicated, gitignored
+# folder so a re-run (e.g. after a failed save) reuses them
+ox.settings.cache_folder = "./.osmnx_cache"
+# Geofabrik .osm.pbf extracts are kept here and parsed locally on later runs
+PBF_CACHE_FOLDER = "./.pbf_cache"
+# Edge weight stored in the CSR cache; testAStar.py rebuilds the cache if its
+# WEIGHT_ATTRIBUTE differs
+CSR_WEIGHT_ATTRIBUTE = "length"
+
+
+def download_from_geofabrik(pbf_url):
+    """Fetches a Geofabrik .osm.pbf extract (once) and parses its driving network.
+
+    Requires the optional pyrosm package. Returns a NetworkX MultiDiGraph with
+    OSMnx-compatible attributes. Note that pyrosm's "driving" filter is not identical
+    to OSMnx's "drive" filter, so the graph differs somewhat from an Overpass download.
+    """
+    from pyrosm import OSM  # Optional dependency, only needed for this source
+
+    os.makedirs(PBF_CACHE_FOLDER, exist_ok=True)
+    pbf_path = os.path.join(PBF_CACHE_FOLDER, os.path.basename(pbf_url))
+    if os.path.exists(pbf_path):
+        print(f"Using cached extract {pbf_path}.")
+    else:
+        print(f"Fetching {pbf_url}...")
+        # Download next to the cache entry and move it into place only once complete,
+        # so an interrupted transfer never looks like a cached extract
+        fd, tmp_path = tempfile.mkstemp(dir=PBF_CACHE_FOLDER, suffix=".part")
+        os.close(fd)
+        try:
+            urllib.request.urlretrieve(pbf_url, tmp_path)
+            os.replace(tmp_path, pbf_path)
+        except BaseException:
+            os.remove(tmp_path)
+            raise
+
+    osm = OSM(pbf_path)
+    nodes, edges = osm.get_network(network_type="driving", nodes=True)
+    return osm.to_graph(nodes, edges, graph_type="networkx")
 
-def download_and_process_location(place_name, output_filename):
-    """Downloads, simplifies, and saves the road network for a given location."""
+
+def download_and_process_location(
+    place_name, output_filename, overwrite=False, source="overpass", pbf_url=None
+):
+    """Downloads, simplifies, and saves the road network for a given location.
+
+    Skips the location if output_filename already exists, unless overwrite is True.
+    With source="geofabrik" the network is parsed from the extract at pbf_url
+    (requires pyrosm); otherwise it is queried from Overpass.
+    """
     print("-" * 30)
     print(f"Processing: {place_name}")
     print("-" * 30)
 
-    # 1. Download the driving road network
+    filepath = f"./{output_filename}"  # Save in the current directory
+    if not overwrite and os.path.exists(filepath):
+        print(f"{filepath} already exists (cached); skipping download.")
+        return
+
+    # 1. Download the driving road network. OSMnx simplifies the Overpass data while
+    # building the graph, so the unsimplified copy is never handed back to us.
     print(f"Downloading driving network for {place_name} from OpenStreetMap...")
     try:
-        G = ox.graph_from_place(place_name, network_type="drive", simplify=False)
+        if source == "geofabrik":
+            G = download_from_geofabrik(pbf_url)
+        else:
+            G = ox.graph_from_place(place_name, network_type="drive", simplify=True)
         print("Successfully downloaded graph.")
-        print(f"Original graph node count: {len(G.nodes)}")
-        print(f"Original graph edge count: {len(G.edges)}")
+        print(f"Downloaded graph node count: {len(G.nodes)}")
+        print(f"Downloaded graph edge count: {len(G.edges)}")
     except Exception as e:
         print(f"An error occurred during download for {place_name}: {e}")
         return  # Skip to next location if download fails
 
-    # 2. Simplify the network topology
-    print("Simplifying the network topology...")
-    try:
-        # Using strict=False is generally recommended for drivability analysis
-        G_simplified = ox.simplify_graph(G)
-        print("Simplification complete.")
-        print(f"Simplified graph node count: {len(G_simplified.nodes)}")
-        print(f"Simplified graph edge count: {len(G_simplified.edges)}")
-    except Exception as e:
-        print(f"An error occurred during simplification for {place_name}: {e}")
-        return  # Skip if simplification fails
+    # 2. Simplify the network topology (pyrosm returns the unsimplified network)
+    if source == "geofabrik":
+        print("Simplifying the network topology...")
+        try:
+            # Rebinding G frees the raw graph as soon as simplify_graph returns (it has
+            # no reference cycles, so G.clear()/gc.collect() would not free it sooner)
+            G = ox.simplify_graph(G)
+            print("Simplification complete.")
+            print(f"Simplified graph node count: {len(G.nodes)}")
+            print(f"Simplified graph edge count: {len(G.edges)}")
+        except Exception as e:
+            print(f"An error occurred during simplification for {place_name}: {e}")
+            return  # Skip if simplification fails
 
     # 3. Save the simplified network to a GraphML file
-    filepath = f"./{output_filename}"  # Save in the current directory
     print(f"Saving the simplified graph to {filepath}...")
     try:
-        ox.save_graphml(G_simplified, filepath=filepath)
+        ox.save_graphml(G, filepath=filepath)
         print(f"Successfully saved the simplified network to {filepath}.")
     except Exception as e:
         print(f"An error occurred while saving the graph for {place_name}: {e}")
+        return  # Skip the caches, which must never be newer than a missing GraphML
+
+    # 4. Save a pickled copy under the name cpp_integration/test.py uses as its parsed
+    # graph cache, so it skips the XML parse entirely (written after the GraphML, so
+    # the cache counts as up to date)
+    pickle_path = filepath + ".pkl"
+    print(f"Saving a pickled copy of the graph to {pickle_path}...")
+    try:
+        with open(pickle_path, "wb") as f:
+            pickle.dump(G, f, protocol=pickle.HIGHEST_PROTOCOL)
+        print(f"Successfully saved the pickled network to {pickle_path}.")
+    except Exception as e:
+        print(f"An error occurred while pickling the graph for {place_name}: {e}")
+
+    # 5. Save the CSR arrays under the name testAStar.py looks for, so A* runs can
+    # skip GraphML parsing and graph preparation (written after the GraphML, so the
+    # cache counts as up to date)
+    csr_path = filepath + ".npz"
+    if graph_to_csr is None:
+        print(
+            "csr_cache is not installed (run 'pip install -e .' in the repository "
+            f"root); skipping {csr_path}."
+        )
+    else:
+        print(f"Saving CSR arrays of the graph to {csr_path}...")
+        try:
+            save_csr_arrays(
+                csr_path, graph_to_csr(G, CSR_WEIGHT_ATTRIBUTE), CSR_WEIGHT_ATTRIBUTE
+            )
+            print(f"Successfully saved the CSR arrays to {csr_path}.")
+        except Exception as e:
+            print(f"An error occurred while saving CSR arrays for {place_name}: {e}")
 
     print(f"\nFinished processing {place_name}.")
 
@@ -56,12 +159,57 @@ locations = {
     "london": {
         "place_name": "London, UK",
         "output_filename": "london_drive_simplified.graphml",
+        # Overpass has to split London into many subqueries; one extract is faster,
+        # but yields a different graph, so it is only used with --geofabrik
+        "pbf_url": "https://download.geofabrik.de/europe/great-britain/england/greater-london-latest.osm.pbf",
     },
 }
 
+# Upper bound on locations fetched at once, to stay polite to the Overpass servers
+MAX_PARALLEL_DOWNLOADS = 2
+
+# --- Command-Line Options ---
+parser = argparse.ArgumentParser(
+    description="Download, simplify and save OpenStreetMap driving networks."
+)
+parser.add_argument(
+    "--locations",
+    help=f"Comma-separated location keys ({', '.join(locations)}) to process "
+    "without showing the selection menu.",
+)
+parser.add_argument(
+    "--non-interactive",
+    action="store_true",
+    help="Skip the selection menu; processes --locations, or shinjuku if not given.",
+)
+parser.add_argument(
+    "--geofabrik",
+    action="store_true",
+    help="Parse locations that have a Geofabrik extract (london) from its .osm.pbf "
+    "file with pyrosm instead of querying Overpass. The graph differs from an "
+    "Overpass download.",
+)
+parser.add_argument(
+    "--overwrite",
+    action="store_true",
+    help="Download again even if the output GraphML file already exists.",
+)
+args = parser.parse_args()
+if args.geofabrik:
+    try:
+        import pyrosm  # noqa: F401
+    except ImportError:
+        parser.error("--geofabrik requires pyrosm (pip install pyrosm)")
+if args.locations is not None:
+    args.non_interactive = True  # Choosing locations on the command line skips the menu
+
 # --- Interactive Choice ---
 selected_locations = []
-while True:
+if args.non_interactive:
+    selected_locations = [
+        key.strip() for key in (args.locations or "shinjuku").split(",") if key.strip()
+    ]
+while not args.non_interactive:
     print("\nSelect which road network(s) to download and process from OpenStreetMap:")
     print("1: Shinjuku, Tokyo (Test Data)")
     print("2: London, UK (Full Data)")
@@ -92,13 +240,29 @@ else:
     print("Starting download and processing...")
     print("Note: Downloading large areas like London can take significant time.")
 
+    configs = []
     for key in selected_locations:
         if key in locations:
-            config = locations[key]
-            download_and_process_location(
-                config["place_name"], config["output_filename"]
-            )
+            config = dict(locations[key])
+            if args.geofabrik and "pbf_url" in config:
+                config["source"] = "geofabrik"
+            configs.append(config)
         else:
             print(f"Warning: Configuration for '{key}' not found. Skipping.")
 
+    # Each location is a separate Overpass session that mostly waits on the network
+    # (releasing the GIL), so threads let the downloads overlap
+    with ThreadPoolExecutor(
+        max_workers=max(1, min(len(configs), MAX_PARALLEL_DOWNLOADS)),
+        thread_name_prefix="Download",
+    ) as executor:
+        list(
+            executor.map(
+                lambda config: download_and_process_location(
+                    **config, overwrite=args.overwrite
+                ),
+                configs,
+            )
+        )
+
     print("\nOverall process finished.")
@@ -0,0 +1,166 @@
+"""Shared parsing of Google Benchmark JSON results for the report scripts."""
+
+import functools
+import json
+import os
+import re
+import sys
+
+try:
+    import orjson  # Optional: C parser, several times faster than the json module
+except ImportError:
+    orjson = None
+
+# Matches e.g. "SetBenchmarkFixture<CoarseLockSet>/BM_CoarseLockOps/.../threads:2_mean"
+# and "BM_CustomFineLockPQ/.../threads:4_stddev"; the aggregate suffix is optional
+BENCHMARK_NAME_RE = re.compile(
+    r"(?:SetBenchmarkFixture<(\w+)>|BM_(\w+))/.*?/threads:(\d+)(?:_(\w+))?$"
+)
+
+# Display names for the implementations
+IMPLEMENTATION_NAMES = {
+    "SequentialSet": "Sequential",
+    "CoarseLockSet": "Coarse Lock",
+    "FineLockSet": "Fine Lock",
+    "StdSet": "std::set",
+    "StdUnorderedSet": "std::unordered_set",
+    "CustomFineLockPQ": "Fine Lock PQ",
+    "StdPriorityQueue": "std::priority_queue",
+}
+
+# Sort categories for tables and legends: concurrent implementations (0) first,
+# then the sequential list (1), then the std:: baselines (2)
+IMPLEMENTATION_CATEGORIES = {"Sequential": 1}
+
+
+@functools.cache
+def implementation_category(name):
+    """Returns the sort category of a display name (see IMPLEMENTATION_CATEGORIES)."""
+    return 2 if name.startswith("std::") else IMPLEMENTATION_CATEGORIES.get(name, 0)
+
+
+def parse(name):
+    """
+    Parses the Google Benchmark name string to extract implementation details.
+
+    Args:
+        name (str): The full benchmark name (e.g.,
+                    "SetBenchmarkFixture<CoarseLockSet>/BM_CoarseLockOps/threads:2_mean",
+                    "BM_CustomFineLockPQ/threads:4_stddev").
+
+    Returns:
+        tuple: (implementation_name, threads, aggregate_type) or (None, None, None) if parsing fails.
+               aggregate_type can be 'mean', 'stddev', etc., or None for raw runs.
+    """
+    match = BENCHMARK_NAME_RE.search(name)
+    if not match:
+        return None, None, None
+
+    # Implementation name is either group 1 or group 2
+    implementation = match.group(1) or match.group(2)
+    implementation = IMPLEMENTATION_NAMES.get(implementation, implementation)
+    return implementation, int(match.group(3)), match.group(4)
+
+
+def process(json_data):
+    """
+    Processes benchmark JSON to extract real_time mean, stddev, and unit.
+
+    Entries without a mean are dropped; a missing stddev (e.g. a single
+    repetition) is reported as 0.0.
+
+    Args:
+        json_data (dict): Loaded JSON data.
+
+    Returns:
+        dict: {impl_name: {threads: {'mean': v, 'stddev': v, 'unit': u}}}
+    """
+    metric = "real_time"
+    cleaned_data = {}
+    # stddevs seen before their mean, keyed by (impl_name, threads)
+    pending_stddevs = {}
+
+    for benchmark in json_data.get("benchmarks", []):
+        name = benchmark.get("name")
+        run_type = benchmark.get("run_type")
+
+        # We only care about aggregate results (mean, stddev)
+        if run_type != "aggregate":
+            continue
+
+        impl_name, threads, aggregate_type = parse(name)
+        if not impl_name:
+            print(
+                f"Warning: Could not parse benchmark name format: {name}",
+                file=sys.stderr,
+            )
+            continue
+        if not threads or aggregate_type not in ["mean", "stddev"]:
+            continue
+
+        value = benchmark.get(metric)
+        unit = benchmark.get("time_unit")
+        if value is None or unit is None:
+            print(
+                f"Warning: Metric '{metric}' or its unit not found for benchmark: {name}",
+                file=sys.stderr,
+            )
+            continue
+
+        # Only a mean creates an entry, so no second pass is needed to drop
+        # stddev-only leftovers; those simply stay in pending_stddevs
+        if aggregate_type == "mean":
+            cleaned_data.setdefault(impl_name, {})[threads] = {
+                "mean": value,
+                "stddev": pending_stddevs.pop((impl_name, threads), 0.0),
+                "unit": unit,
+            }
+        elif threads in cleaned_data.get(impl_name, ()):
+            cleaned_data[impl_name][threads]["stddev"] = value
+        else:
+            pending_stddevs[(impl_name, threads)] = value
+
+    return cleaned_data
+
+
+def load(json_file):
+    """
+    Loads a benchmark JSON file, printing the problem and returning None on failure.
+
+    Args:
+        json_file (str): Path to the benchmark JSON file.
+
+    Returns:
+        dict or None: The loaded JSON data.
+    """
+    if not os.path.exists(json_file):
+        print(f"Error: Input JSON file not found: {json_file}")
+        return None
+
+    try:
+        if orjson is not None:
+            with open(json_file, "rb") as f:
+                return orjson.loads(f.read())
+        with open(json_file, "r") as f:
+            return json.load(f)
+    except json.JSONDecodeError as e:  # orjson.JSONDecodeError subclasses this
+        print(f"Error decoding JSON file {json_file}: {e}")
+    except Exception as e:
+        print(f"Error reading file {json_file}: {e}")
+    return None
+
+
+def table_title(json_file, title=None):
+    """
+    Returns the Markdown table title: title if given, else one naming json_file.
+
+    Args:
+        json_file (str): Path to the benchmark JSON file the table is built from.
+        title (str, optional): User-supplied title (e.g. from --title).
+
+    Returns:
+        str: The table title.
+    """
+    if title:
+        return title
+    return f"Benchmark Execution Time Summary ({os.path.basename(json_file)})"
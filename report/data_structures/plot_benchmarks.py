@@ -1,142 +1,11 @@
 #!/usr/bin/env python3
 
-import json
 import argparse
-import matplotlib.pyplot as plt
-import re
 import os
-from collections import defaultdict
+import sys
+from concurrent.futures import ProcessPoolExecutor
 
-
-def parse_benchmark_name(name):
-    """
-    Parses the Google Benchmark name string to extract implementation details.
-
-    Args:
-        name (str): The full benchmark name (e.g.,
-                    "SetBenchmarkFixture<CoarseLockSet>/BM_CoarseLockOps/threads:2_mean",
-                    "BM_CustomFineLockPQ/threads:4_stddev").
-
-    Returns:
-        tuple: (implementation_name, threads, aggregate_type) or (None, None, None) if parsing fails.
-               aggregate_type can be 'mean', 'stddev', etc.
-    """
-    # Regex to capture implementation (e.g., CoarseLockSet, CustomFineLockPQ) and threads
-    # Handles both SetBenchmarkFixture<...> style and direct BM_... style names
-    # Looks for '/threads:(\d+)' followed by an optional aggregate suffix like '_mean'
-    match = re.search(
-        r"(?:SetBenchmarkFixture<(\w+)>|BM_(\w+))/.*?/threads:(\d+)(?:_(\w+))?$", name
-    )
-
-    if match:
-        # Implementation name is either group 1 or group 2
-        implementation = match.group(1) if match.group(1) else match.group(2)
-        # Remap implementation names for clarity in the legend if needed
-        if implementation == "SequentialSet":
-            implementation = "Sequential"
-        if implementation == "CoarseLockSet":
-            implementation = "Coarse Lock"
-        if implementation == "FineLockSet":
-            implementation = "Fine Lock"
-        if implementation == "StdSet":
-            implementation = "std::set"
-        if implementation == "StdUnorderedSet":
-            implementation = "std::unordered_set"
-        if implementation == "CustomFineLockPQ":
-            implementation = "Fine Lock PQ"
-        if implementation == "StdPriorityQueue":
-            implementation = "std::priority_queue"
-
-        threads = int(match.group(3))
-        aggregate = (
-            match.group(4) if match.group(4) else None
-        )  # Aggregate might be missing for raw runs
-        return implementation, threads, aggregate
-    else:
-        # Fallback or alternative patterns if needed, otherwise return None
-        # Simple pattern for names ending in /threads:N
-        match_simple = re.search(
-            r"(?:SetBenchmarkFixture<(\w+)>|BM_(\w+))/.*?/threads:(\d+)$", name
-        )
-        if match_simple:
-            implementation = (
-                match_simple.group(1)
-                if match_simple.group(1)
-                else match_simple.group(2)
-            )
-            # Remap implementation names
-            if implementation == "SequentialSet":
-                implementation = "Sequential"
-            if implementation == "CoarseLockSet":
-                implementation = "Coarse Lock"
-            if implementation == "FineLockSet":
-                implementation = "Fine Lock"
-            if implementation == "StdSet":
-                implementation = "std::set"
-            if implementation == "StdUnorderedSet":
-                implementation = "std::unordered_set"
-            if implementation == "CustomFineLockPQ":
-                implementation = "Fine Lock PQ"
-            if implementation == "StdPriorityQueue":
-                implementation = "std::priority_queue"
-
-            threads = int(match_simple.group(3))
-            return implementation, threads, None  # No aggregate type specified in name
-        else:
-            print(f"Warning: Could not parse benchmark name format: {name}")
-            return None, None, None
-
-
-def process_benchmark_data(json_data):
-    """
-    Processes the loaded benchmark JSON data to extract real_time metrics.
-
-    Args:
-        json_data (dict): The loaded JSON data from Google Benchmark.
-
-    Returns:
-        dict: A nested dictionary: {impl_name: {threads: {'mean': value, 'stddev': value}}}
-    """
-    metric = "real_time"  # Hardcode to real_time
-    processed_data = defaultdict(lambda: defaultdict(dict))
-
-    for benchmark in json_data.get("benchmarks", []):
-        name = benchmark.get("name")
-        run_type = benchmark.get("run_type")
-
-        # We only care about aggregate results (mean, stddev)
-        if run_type != "aggregate":
-            continue
-
-        impl_name, threads, aggregate_type = parse_benchmark_name(name)
-
-        if not impl_name or not threads or aggregate_type not in ["mean", "stddev"]:
-            continue  # Skip if parsing failed or not the aggregates we need
-
-        # Extract the real_time value
-        value = benchmark.get(metric)
-        if value is None:
-            print(f"Warning: Metric '{metric}' not found for benchmark: {name}")
-            continue
-
-        # Store the mean and stddev
-        processed_data[impl_name][threads][aggregate_type] = value
-
-    # Clean up entries that don't have both mean and stddev (optional, but good practice)
-    cleaned_data = defaultdict(lambda: defaultdict(dict))
-    for impl, thread_data in processed_data.items():
-        for thread_count, metrics in thread_data.items():
-            if "mean" in metrics and "stddev" in metrics:
-                cleaned_data[impl][thread_count] = metrics
-            # Handle cases where stddev might be zero or missing for single-thread runs
-            elif "mean" in metrics and "stddev" not in metrics:
-                # If stddev is missing (e.g., single rep), set it to 0 for plotting
-                cleaned_data[impl][thread_count] = {
-                    "mean": metrics["mean"],
-                    "stddev": 0.0,
-                }
-
-    return cleaned_data
+from _bench_parse import implementation_category, load, process
 
 
 def plot_benchmarks(data, title, output_file, output_format):
@@ -144,11 +13,21 @@ def plot_benchmarks(data, title, output_file, output_format):
     Generates and saves the benchmark plot for execution time.
 
     Args:
-        data (dict): Processed benchmark data from process_benchmark_data.
+        data (dict): Processed benchmark data from _bench_parse.process.
         title (str): The title for the plot.
         output_file (str): Path to save the plot image.
         output_format (str): Format for the output image ('png', 'svg').
+
+    Returns:
+        bool: True if the plot was saved, False if saving failed.
     """
+    # Imported here so --help and input errors don't pay for pyplot; the plot is only
+    # written to a file, so select the non-GUI Agg backend and skip backend probing
+    import matplotlib
+
+    matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+
     fig, ax = plt.subplots(figsize=(12, 7))
 
     # Define markers and colors for consistency if needed, otherwise use defaults
@@ -157,15 +36,11 @@ def plot_benchmarks(data, title, output_file, output_format):
 
     # Sort implementations for consistent legend order
     # Custom sort order: Put baselines last
-    def sort_key(impl_name):
-        if impl_name.startswith("std::"):
-            return 2
-        if impl_name == "Sequential":
-            return 1
-        return 0  # Concurrent implementations first
-
-    sorted_implementations = sorted(data.keys(), key=sort_key)
+    sorted_implementations = sorted(data.keys(), key=implementation_category)
 
+    # Each errorbar call would otherwise rescale the axes; do it once after the loop.
+    # The data limits are still accumulated as the artists are added.
+    ax.set_autoscale_on(False)
     all_thread_counts = set()
     for impl_name in sorted_implementations:
         thread_data = data[impl_name]
@@ -193,6 +68,9 @@ def plot_benchmarks(data, title, output_file, output_format):
         )  # Marker size
         marker_idx += 1
 
+    ax.set_autoscale_on(True)
+    ax.autoscale_view()
+
     # --- Plot Configuration ---
     ax.set_xlabel("Number of Threads")
     # Ensure all used thread counts appear as ticks
@@ -220,21 +98,44 @@ def plot_benchmarks(data, title, output_file, output_format):
 
         plt.savefig(output_file, format=output_format, dpi=150, bbox_inches="tight")
         print(f"Plot saved to {output_file} (format: {output_format})")
+        saved = True
     except Exception as e:
         print(f"Error saving plot to {output_file}: {e}")
+        saved = False
 
     plt.close(fig)  # Close the figure to free memory
+    return saved
+
+
+def _render_one(json_file, output_file, title, output_format):
+    """Loads, processes and plots one benchmark JSON file (a unit of --batch work).
+
+    Returns True if the plot was saved, False otherwise.
+    """
+    benchmark_data = load(json_file)
+    if benchmark_data is None:
+        return False
+    processed_data = process(benchmark_data)
+    if not processed_data:
+        print(f"No suitable benchmark data found or processed in {json_file}.")
+        return False
+    return plot_benchmarks(processed_data, title, output_file, output_format)
 
 
 def main():
     parser = argparse.ArgumentParser(
         description="Generate execution time plots from Google Benchmark JSON results."
     )
-    parser.add_argument(
-        "--json-file", required=True, help="Path to the input benchmark JSON file."
+    inputs = parser.add_mutually_exclusive_group(required=True)
+    inputs.add_argument("--json-file", help="Path to the input benchmark JSON file.")
+    inputs.add_argument(
+        "--batch",
+        help="Comma-separated benchmark JSON files, plotted in parallel processes.",
     )
+    parser.add_argument("--output-file", help="Path to save the output plot image.")
     parser.add_argument(
-        "--output-file", required=True, help="Path to save the output plot image."
+        "--output-files",
+        help="Comma-separated output image paths for --batch, in the same order.",
     )
     parser.add_argument(
         "--output-format",
@@ -243,36 +144,59 @@ def main():
         help="Output image format (png or svg).",
     )
     # Removed the --metric argument
-    parser.add_argument("--title", help="Optional title for the plot.")
+    parser.add_argument(
+        "--title",
+        help="Optional title for the plot (--json-file only; --batch titles each plot "
+        "after its input file).",
+    )
 
     args = parser.parse_args()
 
     # --- Input Validation ---
-    if not os.path.exists(args.json_file):
-        print(f"Error: Input JSON file not found: {args.json_file}")
-        return
-
-    # --- Load Data ---
-    try:
-        with open(args.json_file, "r") as f:
-            benchmark_data = json.load(f)
-    except json.JSONDecodeError as e:
-        print(f"Error decoding JSON file {args.json_file}: {e}")
-        return
-    except Exception as e:
-        print(f"Error reading file {args.json_file}: {e}")
+    if args.json_file:
+        if not args.output_file:
+            parser.error("--json-file requires --output-file")
+        if args.output_files:
+            parser.error("--output-files is only valid with --batch")
+        if not _render_one(
+            args.json_file, args.output_file, args.title, args.output_format
+        ):
+            sys.exit(1)
         return
 
-    # --- Process Data ---
-    # process_benchmark_data now implicitly uses 'real_time'
-    processed_data = process_benchmark_data(benchmark_data)
-    if not processed_data:
-        print("No suitable benchmark data found or processed.")
-        return
+    if args.output_file:
+        parser.error("--output-file is not valid with --batch; use --output-files")
+    if args.title:
+        parser.error("--title is not valid with --batch; each plot is titled per file")
+    json_files = args.batch.split(",")
+    output_files = args.output_files.split(",") if args.output_files else []
+    if len(output_files) != len(json_files):
+        parser.error("--output-files must list one output path per --batch file")
+
+    # --- Generate Plots ---
+    # Each plot is independent, so render them in separate processes
+    num_jobs = len(json_files)
+    titles = [
+        f"Benchmark Comparison ({os.path.basename(json_file)})"
+        for json_file in json_files
+    ]
+    with ProcessPoolExecutor(max_workers=min(num_jobs, os.cpu_count() or 1)) as ex:
+        results = list(
+            ex.map(
+                _render_one,
+                json_files,
+                output_files,
+                titles,
+                [args.output_format] * num_jobs,
+            )
+        )
 
-    # --- Generate Plot ---
-    # plot_benchmarks no longer needs the metric argument
-    plot_benchmarks(processed_data, args.title, args.output_file, args.output_format)
+    failed = [f for f, ok in zip(json_files, results) if not ok]
+    if failed:
+        print(
+            f"Failed to plot {len(failed)} of {num_jobs} file(s): {', '.join(failed)}"
+        )
+        sys.exit(1)
 
 
 if __name__ == "__main__":
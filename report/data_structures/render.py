@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+
+import argparse
+
+from _bench_parse import load, process, table_title
+from generate_benchmark_table import generate_markdown_table
+from plot_benchmarks import plot_benchmarks
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=(
+            "Generate a Markdown table and/or an execution time plot from one "
+            "Google Benchmark JSON file, parsing it only once."
+        )
+    )
+    parser.add_argument(
+        "--json-file", required=True, help="Path to the input benchmark JSON file."
+    )
+    parser.add_argument(
+        "--table", action="store_true", help="Print the Markdown summary table."
+    )
+    parser.add_argument(
+        "--plot", action="store_true", help="Save the execution time plot."
+    )
+    parser.add_argument(
+        "--output-file", help="Path to save the output plot image (with --plot)."
+    )
+    parser.add_argument(
+        "--output-format",
+        choices=["png", "svg"],
+        default="png",
+        help="Output image format (png or svg).",
+    )
+    parser.add_argument("--title", help="Optional title for the table and plot.")
+
+    args = parser.parse_args()
+
+    # --- Input Validation ---
+    if not args.table and not args.plot:
+        parser.error("nothing to do: pass --table and/or --plot")
+    if args.plot and not args.output_file:
+        parser.error("--plot requires --output-file")
+
+    # --- Load and Process Data (once for both outputs) ---
+    benchmark_data = load(args.json_file)
+    if benchmark_data is None:
+        return
+    processed_data = process(benchmark_data)
+    if not processed_data:
+        print("No suitable benchmark data found or processed.")
+        return
+
+    # --- Generate Outputs ---
+    if args.table:
+        generate_markdown_table(processed_data, table_title(args.json_file, args.title))
+    if args.plot:
+        plot_benchmarks(
+            processed_data, args.title, args.output_file, args.output_format
+        )
+
+
+if __name__ == "__main__":
+    main()